@@ -3,6 +3,7 @@ import os
 import glob
 import logging
 import threading
+import multiprocessing
 from typing import Optional, Dict, Any
 from pathlib import Path
 from PyQt5.QtWidgets import (
@@ -26,7 +27,9 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtCore import Qt, QPoint, QThread, pyqtSignal, QTimer, QSettings
 from PyQt5.QtGui import QPixmap, QFont, QPalette, QColor
+from src.assets.gif_cancel import CancelToken
 from src.assets.gif_optimizer import GifOptimizer, OptimizationConfig
+from src.assets.gif_progress import BatchProgress, format_progress
 from dotenv import load_dotenv
 from src.uiitems.close_button import CloseButton
 
@@ -44,11 +47,14 @@ class OptimizationWorker(QThread):
     def __init__(self, optimizer: GifOptimizer):
         super().__init__()
         self.optimizer = optimizer
+        self.cancel_token = optimizer.cancel_token
 
     def run(self):
         try:
-            # Connect progress callback
+            # Connect progress callbacks; they fire on this thread and Qt
+            # queues the signals to the GUI thread (rate-limited to 20 Hz)
             self.optimizer.progress_callback = self.progress_updated.emit
+            self.optimizer.status_callback = self.emit_status
 
             # Process the folder
             stats = self.optimizer.process_folder()
@@ -57,6 +63,9 @@ class OptimizationWorker(QThread):
         except Exception as e:
             self.error_occurred.emit(str(e))
 
+    def emit_status(self, progress: BatchProgress):
+        self.status_updated.emit(format_progress(progress))
+
 
 def find_resource_path(base_path, filename_pattern):
     """
@@ -271,13 +280,30 @@ class GifOptimizerApp(QWidget):
         )
         self.progress_bar.hide()
 
+        # Files, throughput and time left while optimizing
+        self.status_label = QLabel(self)
+        self.status_label.setAlignment(Qt.AlignCenter)
+        self.status_label.setStyleSheet("font-size: 12px; color: black;")
+        self.status_label.hide()
+
         self.gif_folder_button = self.create_button(
             "Select GIF Folder", self.select_gif_folder_path
         )
 
+        # Batch controls, shown while an optimization is running
+        self.pause_button = self.create_button("Pause", self.toggle_pause)
+        self.cancel_button = self.create_button("Cancel", self.cancel_optimization)
+        self.pause_button.hide()
+        self.cancel_button.hide()
+        controls = QHBoxLayout()
+        controls.addWidget(self.pause_button)
+        controls.addWidget(self.cancel_button)
+
         layout.addWidget(self.size_combo)
         layout.addWidget(self.quality_combo)
         layout.addWidget(self.progress_bar)
+        layout.addWidget(self.status_label)
+        layout.addLayout(controls)
         layout.addWidget(self.gif_folder_button)
 
         layout.addWidget(
@@ -423,10 +449,8 @@ class GifOptimizerApp(QWidget):
 
         self.progress_bar.setValue(0)
         self.progress_bar.show()
-
-        def progress_callback(percent):
-            self.progress_bar.setValue(percent)
-            QApplication.processEvents()  # Ensure UI updates
+        self.status_label.setText("")
+        self.status_label.show()
 
         # Create optimization configuration
         config = OptimizationConfig(
@@ -441,32 +465,75 @@ class GifOptimizerApp(QWidget):
             input_folder=self.gif_folder_path,
             target_size_kb=config.target_size_kb,
             config=config,
+            cancel_token=CancelToken(),
         )
 
         # Create and start worker thread
         self.worker_thread = OptimizationWorker(optimizer)
         self.worker_thread.progress_updated.connect(self.update_progress)
+        self.worker_thread.status_updated.connect(self.status_label.setText)
         self.worker_thread.finished.connect(self.optimization_finished)
         self.worker_thread.error_occurred.connect(self.optimization_error)
 
         # Update UI state
         self.gif_folder_button.setEnabled(False)
+        self.pause_button.setText("Pause")
+        self.pause_button.show()
+        self.cancel_button.setEnabled(True)
+        self.cancel_button.show()
         self.worker_thread.start()
 
+    def is_optimizing(self):
+        """True while a worker thread is processing a batch"""
+        return self.worker_thread is not None and self.worker_thread.isRunning()
+
+    def toggle_pause(self):
+        """Pause the running batch, or resume it if paused"""
+        if not self.is_optimizing():
+            return
+        token = self.worker_thread.cancel_token
+        if token.paused:
+            token.resume()
+            self.pause_button.setText("Pause")
+        else:
+            token.pause()
+            self.pause_button.setText("Resume")
+
+    def cancel_optimization(self):
+        """Stop the running batch after the frame in progress"""
+        if not self.is_optimizing():
+            return
+        self.worker_thread.cancel_token.cancel()
+        self.pause_button.hide()
+        self.cancel_button.setEnabled(False)
+
+    def hide_batch_controls(self):
+        self.progress_bar.hide()
+        self.status_label.hide()
+        self.pause_button.hide()
+        self.cancel_button.hide()
+        self.gif_folder_button.setEnabled(True)
+
     def update_progress(self, percentage):
         """Update progress bar"""
         self.progress_bar.setValue(percentage)
 
     def optimization_finished(self, stats):
         """Handle optimization completion"""
-        self.progress_bar.hide()
-        self.gif_folder_button.setEnabled(True)
-        self.show_custom_message()
+        self.hide_batch_controls()
+        if stats.get("cancelled"):
+            QMessageBox.information(
+                self,
+                "Optimization Cancelled",
+                f"Optimized {stats['successful']} GIFs before cancelling "
+                f"({stats['failed']} failed, {stats['cancelled']} not processed).",
+            )
+        else:
+            self.show_custom_message()
 
     def optimization_error(self, error_message):
         """Handle optimization errors"""
-        self.progress_bar.hide()
-        self.gif_folder_button.setEnabled(True)
+        self.hide_batch_controls()
 
         QMessageBox.critical(
             self,
@@ -493,6 +560,10 @@ class GifOptimizerApp(QWidget):
     def closeEvent(self, event):
         """Handle application close event"""
         self.save_settings()
+        if self.is_optimizing():
+            # Let the batch stop cleanly so no output is left half-written
+            self.worker_thread.cancel_token.cancel()
+            self.worker_thread.wait()
         event.accept()
 
     def mousePressEvent(self, event):
@@ -509,6 +580,9 @@ class GifOptimizerApp(QWidget):
 if __name__ == "__main__":
     import sys
 
+    # Required for the optimizer's process pool in frozen (PyInstaller) builds
+    multiprocessing.freeze_support()
+
     app = QApplication(sys.argv)
 
     # Set application properties
@@ -0,0 +1,397 @@
+"""
+Reproducible benchmark for the GIF optimizer
+
+Usage:
+    python -m src.assets.gif_benchmark --output results.json
+    python -m src.assets.gif_benchmark --output new.json --baseline results.json
+
+A deterministic synthetic corpus is generated (or reused) and optimized
+twice, each time in a fresh interpreter: once file by file to measure
+per-file latency and peak memory, and once as a batch with the configured
+worker count to measure throughput. Results are written as JSON so runs
+can be compared.
+With --dither the corpus is also encoded once per dither mode at full size,
+recording each mode's time and output bytes.
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import PIL
+from PIL import Image
+
+from src.assets.gif_dither import DITHER_MODES
+from src.assets.gif_optimizer import GifOptimizer, OptimizationConfig
+from src.assets.gif_results import percentile
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+BENCHMARK_VERSION = 1
+
+# Metrics compared against a baseline, and whether higher values are better
+COMPARED_METRICS = {
+    "files_per_sec": True,
+    "mb_per_sec": True,
+    "latency_p50": False,
+    "latency_p90": False,
+    "latency_p99": False,
+    "peak_rss_mb": False,
+    "compression_ratio": False,
+}
+
+
+@dataclass
+class CorpusSpec:
+    """One synthetic GIF of the benchmark corpus"""
+
+    width: int
+    height: int
+    frames: int
+    colors: int
+    motion: float  # Fraction of the canvas that changes between frames
+
+    @property
+    def name(self) -> str:
+        return (
+            f"{self.width}x{self.height}_f{self.frames}_c{self.colors}"
+            f"_m{int(self.motion * 100):02d}.gif"
+        )
+
+
+def corpus_specs(profile: str = "small") -> List[CorpusSpec]:
+    """Corpus matrix: dimensions x frame counts x palette sizes x motion"""
+    if profile == "full":
+        sizes = [(160, 120), (480, 360), (1280, 720)]
+        frame_counts = [1, 24, 120]
+    else:
+        sizes = [(160, 120), (480, 360)]
+        frame_counts = [1, 24]
+
+    specs = []
+    for width, height in sizes:
+        for frames in frame_counts:
+            for colors in (32, 256):
+                # Motion is meaningless for static images
+                for motion in (0.05,) if frames == 1 else (0.05, 0.5):
+                    specs.append(CorpusSpec(width, height, frames, colors, motion))
+    return specs
+
+
+def generate_gif(spec: CorpusSpec, path: Path, seed: int = 0):
+    """Write a deterministic synthetic GIF described by spec"""
+    rng = np.random.default_rng([seed, spec.width, spec.height, spec.frames])
+    height, width = spec.height, spec.width
+
+    # Smooth background with some texture, so palettes and LZW have work to do
+    y, x = np.mgrid[0:height, 0:width]
+    base = np.stack(
+        [
+            255 * x / max(1, width - 1),
+            255 * y / max(1, height - 1),
+            127 + 64 * np.sin(x / 17.0) * np.cos(y / 23.0),
+        ],
+        axis=2,
+    )
+    base += rng.normal(0, 8, base.shape)
+
+    # Moving block covering `motion` of the canvas
+    block_w = max(1, int(width * np.sqrt(spec.motion)))
+    block_h = max(1, int(height * np.sqrt(spec.motion)))
+    block = rng.integers(0, 256, (block_h, block_w, 3)).astype(np.float64)
+
+    frames = []
+    for idx in range(spec.frames):
+        canvas = base.copy()
+        left = (idx * max(1, width // 10)) % max(1, width - block_w + 1)
+        top = (idx * max(1, height // 12)) % max(1, height - block_h + 1)
+        canvas[top : top + block_h, left : left + block_w] = block
+        frame = Image.fromarray(np.clip(canvas, 0, 255).astype(np.uint8))
+        frames.append(frame.quantize(spec.colors, dither=Image.Dither.NONE))
+
+    frames[0].save(
+        path,
+        save_all=spec.frames > 1,
+        append_images=frames[1:],
+        duration=80,
+        loop=0,
+    )
+
+
+def generate_corpus(folder: Path, profile: str = "small", seed: int = 0) -> List[Path]:
+    """Generate (or reuse) the synthetic corpus in folder"""
+    folder.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for spec in corpus_specs(profile):
+        path = folder / spec.name
+        if not path.exists():
+            generate_gif(spec, path, seed)
+        paths.append(path)
+    return paths
+
+
+def _peak_rss_mb(who) -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(who).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _in_fresh_process(fn: Callable[..., Any], *args: Any) -> Any:
+    """
+    Run fn(*args) in a newly spawned interpreter
+
+    ru_maxrss is a per-process high-water mark, so measuring in this process
+    would include whatever ran before. Linux also carries the mark across
+    fork and exec, so a child starts from this process's footprint: work
+    that grows it, like generating the corpus, runs in a child as well.
+    """
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        return executor.submit(fn, *args).result()
+
+
+def _run_sequential(
+    corpus: Path, config: OptimizationConfig, out_dir: str
+) -> Tuple[List[float], Optional[float]]:
+    """Per-file latencies of optimizing the corpus in process, and peak RSS"""
+    logging.getLogger("src.assets.gif_optimizer").setLevel(logging.WARNING)
+    optimizer = GifOptimizer(
+        str(corpus),
+        target_size_kb=config.target_size_kb,
+        output_folder=out_dir,
+        config=config,
+        max_workers=1,
+    )
+    latencies = []
+    for path in sorted(corpus.glob("*.gif")):
+        start = time.perf_counter()
+        optimizer._optimize_single_gif(path)
+        latencies.append(time.perf_counter() - start)
+    peak_rss = _peak_rss_mb(resource.RUSAGE_SELF) if resource else None
+    return latencies, peak_rss
+
+
+def _run_batch(
+    corpus: Path, config: OptimizationConfig, out_dir: str, workers: Optional[int]
+) -> Tuple[Dict[str, Any], float, int, Optional[float]]:
+    """
+    Optimize the corpus with the worker pool
+
+    Returns:
+        (stats, wall seconds, worker count, peak RSS of the largest worker)
+    """
+    logging.getLogger("src.assets.gif_optimizer").setLevel(logging.WARNING)
+    optimizer = GifOptimizer(
+        str(corpus),
+        target_size_kb=config.target_size_kb,
+        output_folder=out_dir,
+        config=config,
+        max_workers=workers,
+    )
+    start = time.perf_counter()
+    stats = optimizer.process_folder()
+    wall = time.perf_counter() - start
+    # Workers fork from this fresh process, so their peak only adds the
+    # imports they share with it
+    worker_rss = _peak_rss_mb(resource.RUSAGE_CHILDREN) if resource else None
+    return stats, wall, optimizer.max_workers, worker_rss
+
+
+def run_benchmark(
+    corpus: Path,
+    config: OptimizationConfig,
+    workers: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Optimize the corpus and collect performance metrics
+
+    The sequential and the batch pass each run in a fresh interpreter, so
+    their peak RSS reflects the optimizer alone.
+
+    Returns:
+        Dict of metrics (see COMPARED_METRICS)
+    """
+    files = sorted(corpus.glob("*.gif"))
+    input_bytes = sum(f.stat().st_size for f in files)
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        latencies, peak_rss = _in_fresh_process(
+            _run_sequential, corpus, config, os.path.join(out_dir, "sequential")
+        )
+        stats, wall, worker_count, worker_rss = _in_fresh_process(
+            _run_batch, corpus, config, os.path.join(out_dir, "batch"), workers
+        )
+
+    output_kb = stats["total_optimized_size"]
+    return {
+        "files": len(files),
+        "successful": stats["successful"],
+        "workers": worker_count,
+        "wall_seconds": wall,
+        "files_per_sec": len(files) / wall if wall else 0.0,
+        "mb_per_sec": input_bytes / (1024 * 1024) / wall if wall else 0.0,
+        "latency_p50": percentile(latencies, 50),
+        "latency_p90": percentile(latencies, 90),
+        "latency_p99": percentile(latencies, 99),
+        "peak_rss_mb": peak_rss,
+        "worker_peak_rss_mb": worker_rss,
+        "compression_ratio": output_kb * 1024 / input_bytes if input_bytes else 0.0,
+    }
+
+
+def run_dither_sweep(
+    corpus: Path, config: OptimizationConfig
+) -> Dict[str, Dict[str, float]]:
+    """
+    Encode the corpus once per dither mode, without the size search
+
+    The target is set out of reach and passthrough is off, so every file is
+    encoded exactly once at full size with the configured palette; the modes
+    then differ only in quantization time and in how well LZW compresses
+    their output.
+
+    Returns:
+        Dict of mode -> {"seconds", "quantize_seconds", "output_bytes"}
+    """
+    sweep = {}
+    with tempfile.TemporaryDirectory() as out_dir:
+        for mode in DITHER_MODES:
+            mode_config = replace(
+                config,
+                dither=mode,
+                target_size_kb=1 << 30,
+                max_encodes=1,
+                passthrough=False,
+            )
+            optimizer = GifOptimizer(
+                str(corpus),
+                target_size_kb=mode_config.target_size_kb,
+                output_folder=os.path.join(out_dir, mode),
+                config=mode_config,
+                max_workers=1,
+            )
+            start = time.perf_counter()
+            stats = optimizer.process_folder()
+            sweep[mode] = {
+                "seconds": time.perf_counter() - start,
+                "quantize_seconds": stats["stage_times"].get("quantize", 0.0),
+                "output_bytes": int(stats["total_optimized_size"] * 1024),
+            }
+    return sweep
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float):
+    """
+    Compare metrics against a baseline run
+
+    Returns:
+        List of (metric, baseline, current, relative change, regressed)
+    """
+    rows = []
+    for metric, higher_is_better in COMPARED_METRICS.items():
+        old = baseline["metrics"].get(metric)
+        new = results["metrics"].get(metric)
+        if not old or new is None:
+            continue
+        change = (new - old) / old
+        regressed = -change > threshold if higher_is_better else change > threshold
+        rows.append((metric, old, new, change, regressed))
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.assets.gif_benchmark",
+        description="Benchmark GifOptimizer on a synthetic GIF corpus.",
+    )
+    parser.add_argument(
+        "--corpus",
+        default=os.path.join(tempfile.gettempdir(), "tinygif_benchmark_corpus"),
+        help="Corpus folder (generated if missing)",
+    )
+    parser.add_argument("--profile", choices=["small", "full"], default="small")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--target-size-kb", type=int, default=50)
+    parser.add_argument("-j", "--workers", type=int, default=None)
+    parser.add_argument(
+        "--dither",
+        action="store_true",
+        help="Also time each dither mode and record its output bytes",
+    )
+    parser.add_argument("--output", help="Write results JSON here")
+    parser.add_argument("--baseline", help="Results JSON to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="Relative change counted as a regression (default: 0.10)",
+    )
+    args = parser.parse_args(argv)
+
+    logging.getLogger("src.assets.gif_optimizer").setLevel(logging.WARNING)
+
+    # Versioned, so a corpus cached by an older generator is never reused
+    corpus_name = f"v{BENCHMARK_VERSION}_{args.profile}_seed{args.seed}"
+    corpus = Path(args.corpus) / corpus_name
+    _in_fresh_process(generate_corpus, corpus, args.profile, args.seed)
+
+    config = OptimizationConfig(target_size_kb=args.target_size_kb)
+    results = {
+        "version": BENCHMARK_VERSION,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": {
+            "python": platform.python_version(),
+            "pillow": PIL.__version__,
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "corpus": {
+            "profile": args.profile,
+            "seed": args.seed,
+            "specs": [asdict(spec) for spec in corpus_specs(args.profile)],
+        },
+        "config": asdict(config),
+        "metrics": run_benchmark(corpus, config, args.workers),
+    }
+    if args.dither:
+        results["dither"] = run_dither_sweep(corpus, config)
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(text, encoding="utf-8")
+    print(text)
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        rows = compare(results, baseline, args.threshold)
+        for metric, old, new, change, regressed in rows:
+            flag = "  REGRESSION" if regressed else ""
+            print(
+                f"{metric:>18}: {old:10.4f} -> {new:10.4f} ({change:+.1%}){flag}",
+                file=sys.stderr,
+            )
+        if any(row[4] for row in rows):
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.assets.gif_io import atomic_copy, atomic_write
+
+# Bump when encoder changes make previously cached outputs stale
+CACHE_VERSION = 1
+
+# Seconds after which an eviction lock is considered abandoned
+STALE_LOCK_SECONDS = 60
+
+READ_CHUNK = 1 << 20
+
+# Eviction frees down to this fraction of the cap, so a full cache is not
+# rescanned on every put
+EVICT_TO = 0.9
+
+
+class ResultCache:
+    """
+    Content-addressed on-disk cache of optimized outputs
+
+    Entries are keyed by a hash of the input bytes and the effective
+    optimization settings and stored as <dir>/<key[:2]>/<key>.gif (WebP and
+    APNG outputs keep the same name; peek() tells them apart). Entries and
+    copies served from the cache are written to a temporary file and renamed
+    into place, so concurrent readers in other processes only ever see
+    complete files. The entry mtime is refreshed on every hit and used as the
+    LRU clock when the cache grows beyond max_bytes.
+
+    The cache size is scanned once, at the first put(), and then kept as a
+    running total, so entries are only listed again once the total goes
+    over the cap; eviction then frees down to EVICT_TO of it. Entries added
+    by other processes are only seen at that rescan, so concurrent writers
+    can briefly overshoot the cap.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        """
+        Args:
+            directory: Cache directory (created if missing)
+            max_bytes: Size cap; least recently used entries are evicted above it
+        """
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Bytes in the cache: last scan plus this instance's puts since
+        self._total: Optional[int] = None
+
+    @staticmethod
+    def make_key(input_path: Path, settings: Dict[str, Any]) -> str:
+        """Hash of the input file contents and the settings used to encode it"""
+        digest = hashlib.sha256()
+        digest.update(
+            json.dumps(
+                {"version": CACHE_VERSION, "settings": settings}, sort_keys=True
+            ).encode()
+        )
+        with open(input_path, "rb") as fp:
+            for chunk in iter(lambda: fp.read(READ_CHUNK), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.gif"
+
+    def peek(self, key: str, size: int = 16) -> Optional[bytes]:
+        """First bytes of a cached output (enough to tell its format), or None"""
+        try:
+            with open(self._entry_path(key), "rb") as fp:
+                return fp.read(size)
+        except FileNotFoundError:
+            return None
+
+    def get(self, key: str, destination: Path, fsync: bool = False) -> Optional[int]:
+        """
+        Copy a cached output to destination (flushed to disk with fsync)
+
+        Returns:
+            Size of the cached output in bytes, or None on a miss
+        """
+        entry = self._entry_path(key)
+        try:
+            size = atomic_copy(entry, destination, fsync=fsync)
+            os.utime(entry)
+        except FileNotFoundError:
+            # Missing, or evicted by another process mid-copy
+            return None
+        return size
+
+    def put(self, key: str, data: bytes):
+        """Store an output, then evict old entries if the cache is over its cap"""
+        if self._total is None:
+            self._total = sum(size for _, size, _ in self._scan())
+        entry = self._entry_path(key)
+        entry.parent.mkdir(exist_ok=True)
+        try:
+            replaced = entry.stat().st_size
+        except FileNotFoundError:
+            replaced = 0
+        atomic_write(entry, data)
+        self._total += len(data) - replaced
+        if self._total > self.max_bytes:
+            self.evict()
+
+    def _scan(self) -> List[Tuple[float, int, Path]]:
+        """(mtime, size, path) of every entry"""
+        entries = []
+        for path in self.directory.glob("*/*.gif"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def evict(self):
+        """Remove least recently used entries until the cache is under its cap"""
+        lock = self.directory / ".evict.lock"
+        if not _acquire_lock(lock):
+            # Another process is already evicting
+            return
+
+        try:
+            entries = self._scan()
+            total = sum(size for _, size, _ in entries)
+
+            entries.sort()
+            target = self.max_bytes * EVICT_TO if total > self.max_bytes else total
+            for _, size, path in entries:
+                if total <= target:
+                    break
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+                total -= size
+            self._total = total
+        finally:
+            lock.unlink(missing_ok=True)
+
+
+def _acquire_lock(lock: Path) -> bool:
+    """Create lock exclusively, breaking it if its holder appears to have died"""
+    try:
+        fd = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        try:
+            if time.time() - lock.stat().st_mtime < STALE_LOCK_SECONDS:
+                return False
+            lock.unlink()
+        except FileNotFoundError:
+            pass
+        try:
+            fd = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+    os.close(fd)
+    return True
+
@@ -0,0 +1,49 @@
+import multiprocessing
+
+
+class OptimizationCancelled(Exception):
+    """Raised inside a batch once its CancelToken has been cancelled"""
+
+    pass
+
+
+class CancelToken:
+    """
+    Cooperative cancel and pause switch for a running batch
+
+    The optimizer calls check() between files and between frames; it blocks
+    while the batch is paused and raises OptimizationCancelled once it has
+    been cancelled. The flags are multiprocessing events, so the same token
+    also reaches worker processes when passed to them at pool start-up.
+    """
+
+    def __init__(self):
+        self._cancelled = multiprocessing.Event()
+        self._running = multiprocessing.Event()
+        self._running.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    @property
+    def paused(self) -> bool:
+        return not self._running.is_set()
+
+    def cancel(self):
+        """Stop at the next check (also releases a paused batch)"""
+        self._cancelled.set()
+        self._running.set()
+
+    def pause(self):
+        """Hold the batch at the next check until resume() or cancel()"""
+        self._running.clear()
+
+    def resume(self):
+        self._running.set()
+
+    def check(self):
+        """Block while paused, then raise OptimizationCancelled if cancelled"""
+        self._running.wait()
+        if self._cancelled.is_set():
+            raise OptimizationCancelled()
@@ -0,0 +1,224 @@
+"""
+Headless command-line entry point for the GIF optimizer
+
+Usage:
+    python -m src.assets.gif_cli INPUT_FOLDER [options]
+
+Statistics are printed to stdout as JSON; logs go to stderr. This module
+must not import PyQt5 (or anything from main.py) so it runs on servers
+without a display.
+"""
+
+import argparse
+import dataclasses
+import json
+import signal
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+from src.assets.gif_cancel import CancelToken
+from src.assets.gif_optimizer import GifOptimizer, OptimizationConfig
+
+# Exit codes
+EXIT_OK = 0
+EXIT_FAILED_FILES = 1
+EXIT_USAGE = 2
+EXIT_INTERRUPTED = 130
+
+
+def _option_name(field_name: str) -> str:
+    return "--" + field_name.replace("_", "-")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Argument parser exposing every OptimizationConfig field"""
+    parser = argparse.ArgumentParser(
+        prog="python -m src.assets.gif_cli",
+        description="Optimize every GIF in a folder for the web.",
+    )
+    parser.add_argument("input_folder", help="Folder containing GIF files")
+    parser.add_argument(
+        "-o",
+        "--output-folder",
+        help="Output folder (defaults to INPUT_FOLDER/optimized)",
+    )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes (defaults to the number of CPU cores)",
+    )
+    parser.add_argument(
+        "-r",
+        "--recursive",
+        action="store_true",
+        help="Also process subfolders, mirroring them in the output folder",
+    )
+    parser.add_argument(
+        "--include",
+        action="append",
+        metavar="GLOB",
+        help="Only process files whose relative path matches, ignoring case "
+        "(repeatable)",
+    )
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        metavar="GLOB",
+        help="Skip files or folders whose relative path matches, ignoring case "
+        "(repeatable)",
+    )
+    parser.add_argument(
+        "--follow-symlinks",
+        action="store_true",
+        help="Follow symlinked files and folders (ignored by default)",
+    )
+    parser.add_argument(
+        "--memory-budget-mb",
+        type=int,
+        default=2048,
+        help="Estimated decoded-frame memory shared by all workers",
+    )
+    parser.add_argument(
+        "--fsync",
+        action="store_true",
+        help="Flush every output to disk before it is renamed into place",
+    )
+    parser.add_argument(
+        "--hardlink",
+        action="store_true",
+        help="Hard link files that are already under target instead of copying",
+    )
+    parser.add_argument("--cache-dir", help="Enable the result cache in this folder")
+    parser.add_argument(
+        "--cache-max-mb", type=int, default=1024, help="Result cache size cap in MB"
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only process files that changed since the last run",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and optimize files as they are added",
+    )
+    parser.add_argument(
+        "--report",
+        help="Write one row per file to this report (.jsonl, or .csv for CSV)",
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="PATH",
+        help="Write a Chrome trace of the batch's stages to this JSON file",
+    )
+    parser.add_argument(
+        "--indent", type=int, default=None, help="Indent the JSON statistics"
+    )
+
+    config = parser.add_argument_group("optimization settings")
+    defaults = OptimizationConfig()
+    for field in dataclasses.fields(OptimizationConfig):
+        default = getattr(defaults, field.name)
+        if isinstance(default, bool):
+            config.add_argument(
+                _option_name(field.name),
+                dest=field.name,
+                action=argparse.BooleanOptionalAction,
+                default=default,
+            )
+        else:
+            field_type = type(default) if default is not None else str
+            config.add_argument(
+                _option_name(field.name),
+                dest=field.name,
+                type=field_type,
+                default=default,
+                help=f"(default: {default})",
+            )
+    return parser
+
+
+def config_from_args(args: argparse.Namespace) -> OptimizationConfig:
+    """OptimizationConfig populated from parsed arguments"""
+    return OptimizationConfig(
+        **{
+            field.name: getattr(args, field.name)
+            for field in dataclasses.fields(OptimizationConfig)
+        }
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if not Path(args.input_folder).is_dir():
+        print(f"Input folder not found: {args.input_folder}", file=sys.stderr)
+        return EXIT_USAGE
+    if args.workers is not None and args.workers < 1:
+        print("--workers must be at least 1", file=sys.stderr)
+        return EXIT_USAGE
+
+    config = config_from_args(args)
+    cancel_token = CancelToken()
+    try:
+        optimizer = GifOptimizer(
+            input_folder=args.input_folder,
+            target_size_kb=config.target_size_kb,
+            output_folder=args.output_folder,
+            config=config,
+            max_workers=args.workers,
+            cache_dir=args.cache_dir,
+            cache_max_mb=args.cache_max_mb,
+            incremental=args.incremental,
+            trace_path=args.trace,
+            report_path=args.report,
+            cancel_token=cancel_token,
+            recursive=args.recursive,
+            include=args.include,
+            exclude=args.exclude,
+            follow_symlinks=args.follow_symlinks,
+            memory_budget_mb=args.memory_budget_mb,
+            fsync=args.fsync,
+            hardlink=args.hardlink,
+        )
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return EXIT_USAGE
+
+    exit_code = EXIT_OK
+    try:
+        if args.watch:
+            from src.assets.gif_watcher import GifFolderWatcher
+
+            watcher = GifFolderWatcher(optimizer, max_workers=args.workers)
+            signal.signal(signal.SIGTERM, lambda *_: watcher.stop())
+            try:
+                watcher.run()
+            except KeyboardInterrupt:
+                watcher.stop()
+            stats = optimizer.stats
+        else:
+            # SIGTERM stops after the current frame and still reports stats
+            signal.signal(signal.SIGTERM, lambda *_: cancel_token.cancel())
+            stats = optimizer.process_folder()
+            if cancel_token.cancelled:
+                exit_code = EXIT_INTERRUPTED
+    except KeyboardInterrupt:
+        optimizer.results.close()
+        stats = optimizer.stats
+        exit_code = EXIT_INTERRUPTED
+
+    json.dump(stats, sys.stdout, indent=args.indent)
+    sys.stdout.write("\n")
+
+    if exit_code == EXIT_OK and stats.get("failed"):
+        exit_code = EXIT_FAILED_FILES
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
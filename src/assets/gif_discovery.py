@@ -0,0 +1,163 @@
+import logging
+import os
+import queue
+import threading
+from pathlib import Path, PurePosixPath
+from typing import Iterable, Iterator, Optional, Sequence, Set
+
+logger = logging.getLogger(__name__)
+
+GIF_SUFFIX = ".gif"
+
+
+def _matches(relative: str, patterns: Sequence[str]) -> bool:
+    """
+    True if any glob matches the relative path (anchored at its end)
+
+    Matching ignores case, like the .gif suffix; patterns are lowercased by
+    the caller.
+    """
+    path = PurePosixPath(relative.lower())
+    return any(path.match(pattern) for pattern in patterns)
+
+
+def walk_gif_files(
+    root: Path,
+    recursive: bool = False,
+    include: Optional[Sequence[str]] = None,
+    exclude: Optional[Sequence[str]] = None,
+    follow_symlinks: bool = False,
+    skip_dirs: Iterable[Path] = (),
+) -> Iterator[Path]:
+    """
+    Stream the GIF files under root
+
+    The walk is an explicit depth-first stack of os.scandir() calls, so
+    files are yielded as soon as their directory has been read, without
+    materializing the whole tree. Entries are sorted per directory for a
+    stable order. The .gif suffix is matched case-insensitively, once per
+    entry, so case-insensitive filesystems do not produce duplicates; the
+    include and exclude globs ignore case as well, so "*.gif" keeps B.GIF.
+
+    Args:
+        root: Folder to walk
+        recursive: Descend into subfolders
+        include: Globs a file's path relative to root must match (any of);
+            matched from the right, so "*.gif" matches at every depth
+        exclude: Globs of relative file or folder paths to leave out
+        follow_symlinks: Follow symlinked files and folders (deduplicated by
+            real path, loops are skipped); otherwise symlinks are ignored
+        skip_dirs: Folders never entered, e.g. the output folder
+
+    Yields:
+        Paths below root (root joined with the relative path)
+    """
+    include = [pattern.lower() for pattern in include or []]
+    exclude = [pattern.lower() for pattern in exclude or []]
+    skipped: Set[str] = {os.path.realpath(path) for path in skip_dirs}
+    visited_dirs: Set[str] = set()
+    seen_files: Set[str] = set()
+
+    # (directory path, its real path, path relative to root)
+    stack = [(str(root), os.path.realpath(root), "")]
+    while stack:
+        directory, real_dir, relative_dir = stack.pop()
+        if real_dir in visited_dirs or real_dir in skipped:
+            continue
+        visited_dirs.add(real_dir)
+
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError as e:
+            logger.warning(f"Cannot read {directory}: {e}")
+            continue
+
+        subdirs = []
+        for entry in entries:
+            relative = f"{relative_dir}{entry.name}"
+            try:
+                is_link = entry.is_symlink()
+                if is_link and not follow_symlinks:
+                    continue
+                is_dir = entry.is_dir()
+                is_file = not is_dir and entry.is_file()
+            except OSError:
+                continue
+
+            if exclude and _matches(relative, exclude):
+                continue
+
+            if is_dir:
+                if recursive:
+                    real = (
+                        os.path.realpath(entry.path)
+                        if is_link
+                        else os.path.join(real_dir, entry.name)
+                    )
+                    subdirs.append((entry.path, real, relative + "/"))
+            elif is_file and entry.name.lower().endswith(GIF_SUFFIX):
+                if include and not _matches(relative, include):
+                    continue
+                if follow_symlinks:
+                    # Only symlinks can reach a file a second time
+                    real = (
+                        os.path.realpath(entry.path)
+                        if is_link
+                        else os.path.join(real_dir, entry.name)
+                    )
+                    if real in seen_files:
+                        continue
+                    seen_files.add(real)
+                yield Path(root, relative)
+
+        # Reversed so subfolders are visited in name order
+        stack.extend(reversed(subdirs))
+
+
+# Marks the end of a WalkAhead queue
+_WALK_DONE = object()
+
+
+class WalkAhead:
+    """
+    Runs a file walk in a background thread, ahead of its consumer
+
+    Discovered paths are queued as the walk finds them, so processing starts
+    right away while the walk keeps going and totals (e.g. for progress) are
+    known long before processing catches up. Iterating blocks until the next
+    path is found; an exception raised by the walk is re-raised to the
+    consumer once the paths found before it have been consumed.
+    """
+
+    def __init__(self, paths: Iterator[Path]):
+        self._queue: "queue.Queue" = queue.Queue()
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, args=(paths,), daemon=True)
+        self._thread.start()
+
+    def _run(self, paths: Iterator[Path]):
+        try:
+            for path in paths:
+                self._queue.put(path)
+        except BaseException as e:
+            self._error = e
+        finally:
+            self._queue.put(_WALK_DONE)
+
+    def __iter__(self) -> "WalkAhead":
+        return self
+
+    def __next__(self) -> Path:
+        item = self._queue.get()
+        if item is _WALK_DONE:
+            # Leave the marker for later calls
+            self._queue.put(_WALK_DONE)
+            if self._error is not None:
+                raise self._error
+            raise StopIteration
+        return item
+
+    def drain(self) -> int:
+        """Wait for the walk to finish; number of paths never consumed"""
+        return sum(1 for _ in self)
@@ -0,0 +1,117 @@
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+
+DITHER_MODES = ("none", "ordered", "floyd-steinberg")
+
+
+def bayer_matrix(size: int = 8) -> np.ndarray:
+    """
+    Bayer threshold matrix normalized to [-0.5, 0.5)
+
+    Args:
+        size: Matrix size, a power of two
+    """
+    matrix = np.zeros((1, 1), dtype=np.int64)
+    while matrix.shape[0] < size:
+        matrix = np.block(
+            [[4 * matrix, 4 * matrix + 2], [4 * matrix + 3, 4 * matrix + 1]]
+        )
+    return (matrix + 0.5) / matrix.size - 0.5
+
+
+BAYER_8 = bayer_matrix(8)
+
+
+def dither_amplitude(palette_size: int, strength: float) -> float:
+    """
+    Ordered dither amplitude for a palette
+
+    A palette of N colors spaced evenly through the RGB cube is about
+    255 / cbrt(N) apart per channel; noise of that size makes neighboring
+    pixels straddle adjacent entries.
+    """
+    return strength * 255 / max(1.0, palette_size ** (1 / 3))
+
+
+def ordered_dither(
+    rgb: np.ndarray, amplitude: float, origin: Tuple[int, int] = (0, 0)
+) -> np.ndarray:
+    """
+    Offset colors by a tiled Bayer pattern
+
+    The pattern is anchored to the canvas, so a region cropped at origin
+    gets the same thresholds as in the full frame and static areas do not
+    flicker between frames.
+
+    Args:
+        rgb: (H, W, 3) uint8 colors
+        amplitude: Offset range in RGB units
+        origin: (x, y) of rgb's top-left pixel on the canvas
+
+    Returns:
+        (H, W, 3) uint8 dithered colors, ready for nearest-color mapping
+    """
+    height, width = rgb.shape[:2]
+    size = BAYER_8.shape[0]
+    rows = (np.arange(height) + origin[1]) % size
+    cols = (np.arange(width) + origin[0]) % size
+    offsets = (BAYER_8[rows[:, None], cols[None, :]] * amplitude).astype(np.float32)
+    return np.clip(rgb + offsets[..., None], 0, 255).astype(np.uint8)
+
+
+def floyd_steinberg(
+    rgb: np.ndarray,
+    nearest: Callable[[np.ndarray], np.ndarray],
+    palette: np.ndarray,
+    strength: float = 1.0,
+    mask: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Floyd-Steinberg error diffusion with adjustable strength
+
+    A pixel only depends on its left neighbor and the three pixels above it,
+    so every pixel with the same 2*y + x is independent of the others. The
+    image is swept along those wavefronts (2*H + W steps), each one a single
+    vectorized nearest-color lookup and error update.
+
+    Args:
+        rgb: (H, W, 3) colors
+        nearest: Maps (N, 3) float32 colors to (N,) palette indices
+        palette: (P, 3) palette the indices refer to
+        strength: Fraction of the quantization error diffused (0-1)
+        mask: (H, W) pixels whose error is not spread (e.g. transparent ones,
+            whose indices the caller replaces)
+
+    Returns:
+        (H, W) uint8 indices
+    """
+    height, width = rgb.shape[:2]
+    # Flat work buffer with a one-pixel margin left, right and below, so
+    # error spilling off the image lands in the margin instead of needing
+    # bounds checks
+    stride = width + 2
+    work = np.zeros(((height + 1) * stride, 3), dtype=np.float32)
+    work.reshape(height + 1, stride, 3)[:height, 1:-1] = rgb
+    palette = palette.astype(np.float32)
+    indices = np.zeros((height, width), dtype=np.uint8)
+    weights = np.array([7, 3, 5, 1], dtype=np.float32) * (strength / 16)
+    spread = np.array([1, stride - 1, stride, stride + 1])
+
+    for step in range(width + 2 * (height - 1)):
+        y_min = max(0, (step - width + 2) // 2)
+        y_max = min(height - 1, step // 2)
+        ys = np.arange(y_min, y_max + 1)
+        xs = step - 2 * ys
+        flat = ys * stride + xs + 1
+
+        colors = np.clip(work[flat], 0, 255)
+        found = nearest(colors)
+        indices[ys, xs] = found
+        error = colors - palette[found]
+        if mask is not None:
+            error[mask[ys, xs]] = 0
+        for offset, weight in zip(spread, weights):
+            work[flat + offset] += error * weight
+
+    return indices
@@ -0,0 +1,132 @@
+from typing import BinaryIO, List, Optional
+
+from PIL import Image
+
+from src.assets.gif_palette import PaletteMapper
+from src.assets.gif_stream import quantize_frame
+from src.assets.gif_trace import NULL_TIMER, StageTimer
+
+# Formats the optimizer can write; "auto" tries each and keeps the best
+OUTPUT_FORMATS = ("gif", "webp", "apng")
+AUTO_FORMAT = "auto"
+
+FORMAT_SUFFIX = {"gif": ".gif", "webp": ".webp", "apng": ".png"}
+
+
+def sniff_format(header: bytes) -> str:
+    """Output format of encoded data, from its first bytes"""
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "webp"
+    if header[:8] == b"\x89PNG\r\n\x1a\n":
+        return "apng"
+    return "gif"
+
+
+def play_count(gif_loop: Optional[int]) -> int:
+    """
+    WebP/APNG play count equivalent to a GIF loop setting
+
+    GIF stores repeats after the first play (0 = forever) and plays once
+    without a NETSCAPE extension; WebP and APNG store total plays (0 = forever).
+    """
+    if gif_loop is None:
+        return 1
+    if gif_loop == 0:
+        return 0
+    return gif_loop + 1
+
+
+def save_still(
+    frame: Image.Image,
+    fp: BinaryIO,
+    fmt: str,
+    colors: int = 256,
+    quality: int = 85,
+    dither: str = "none",
+    dither_strength: float = 1.0,
+):
+    """Encode a single RGBA frame as WebP or (palette) PNG"""
+    if fmt == "webp":
+        frame.save(fp, "WEBP", quality=quality, method=4)
+        return
+
+    im, transparency = quantize_frame(frame, colors, dither, dither_strength)
+    params = {} if transparency is None else {"transparency": transparency}
+    im.save(fp, "PNG", optimize=True, **params)
+
+
+class AnimationWriter:
+    """
+    Writes frames as an animated WebP or APNG
+
+    Same interface as GifStreamWriter. Pillow's WebP and APNG encoders take
+    the whole sequence at once, so frames (already resized and deduplicated)
+    are held until close(). APNG frames share one palette when a
+    PaletteMapper is given, which keeps them far smaller than truecolor.
+    """
+
+    def __init__(
+        self,
+        fp: BinaryIO,
+        fmt: str,
+        loop: Optional[int] = 0,
+        quality: int = 85,
+        palette: Optional[PaletteMapper] = None,
+        dither: str = "none",
+        dither_strength: float = 1.0,
+        timer: StageTimer = NULL_TIMER,
+    ):
+        """
+        Args:
+            fp: Writable binary file object
+            fmt: "webp" or "apng"
+            loop: Source GIF loop setting (None = play once, 0 = forever)
+            quality: Lossy WebP quality (0-100)
+            palette: Shared palette for APNG frames (None keeps RGBA)
+            dither: Dither mode used with the shared palette
+            dither_strength: Dither strength (0-1)
+            timer: Receives quantize and encode timings
+        """
+        self.fp = fp
+        self.fmt = fmt
+        self.loop = play_count(loop)
+        self.quality = quality
+        self.palette = palette if fmt == "apng" else None
+        self.dither = dither
+        self.dither_strength = dither_strength
+        self.timer = timer
+        self.frame_count = 0
+        self._frames: List[Image.Image] = []
+        self._durations: List[int] = []
+        self._transparency: Optional[int] = None
+
+    def add_frame(self, frame: Image.Image, duration: int):
+        """Queue an RGBA frame"""
+        if self.palette is not None:
+            with self.timer.stage("quantize"):
+                frame, transparency = self.palette.quantize(
+                    frame, self.dither, self.dither_strength
+                )
+            if transparency is not None:
+                self._transparency = transparency
+        self._frames.append(frame)
+        self._durations.append(duration)
+        self.frame_count += 1
+
+    def close(self):
+        """Encode the queued frames"""
+        if not self._frames:
+            return
+        first, rest = self._frames[0], self._frames[1:]
+        params = {"save_all": True, "append_images": rest, "loop": self.loop}
+        params["duration"] = self._durations if rest else self._durations[0]
+
+        with self.timer.stage("encode"):
+            if self.fmt == "webp":
+                first.save(self.fp, "WEBP", quality=self.quality, method=4, **params)
+            else:
+                if self._transparency is not None:
+                    params["transparency"] = self._transparency
+                first.save(self.fp, "PNG", optimize=True, **params)
+        self._frames = []
+        self._durations = []
@@ -0,0 +1,76 @@
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from src.assets.gif_stream import reduce_factor
+
+
+@dataclass(frozen=True)
+class FrameTransform:
+    """What every frame of one encode goes through"""
+
+    size: Optional[Tuple[int, int]]  # Output size, None keeps the source size
+    reduce: int  # Integer box reduction applied right after decoding
+
+
+class GeometryPlan:
+    """
+    Output geometry of one file
+
+    The source is first clamped into the max_width x max_height box,
+    preserving its aspect ratio. Search scales then apply to that clamped
+    size, and the transform for each scale is computed once and shared by
+    every frame of the encode.
+    """
+
+    def __init__(
+        self,
+        source: Tuple[int, int],
+        max_width: Optional[int] = None,
+        max_height: Optional[int] = None,
+    ):
+        """
+        Args:
+            source: Source (width, height)
+            max_width: Largest output width (None or 0 for no limit)
+            max_height: Largest output height (None or 0 for no limit)
+        """
+        self.source = source
+        width, height = source
+        fit = 1.0
+        if max_width:
+            fit = min(fit, max_width / width)
+        if max_height:
+            fit = min(fit, max_height / height)
+        self.base = (max(1, int(width * fit)), max(1, int(height * fit)))
+        self._transforms: Dict[float, FrameTransform] = {}
+
+    @property
+    def clamped(self) -> bool:
+        """True if the bounding box shrinks the source"""
+        return self.base != self.source
+
+    @property
+    def area_ratio(self) -> float:
+        """Pixel count of the clamped size relative to the source"""
+        return (self.base[0] * self.base[1]) / (self.source[0] * self.source[1])
+
+    def size_at(self, scale: float) -> Tuple[int, int]:
+        """Output size at a search scale (relative to the clamped size)"""
+        if scale >= 1.0:
+            return self.base
+        return (
+            max(1, int(self.base[0] * scale)),
+            max(1, int(self.base[1] * scale)),
+        )
+
+    def transform(self, scale: float) -> FrameTransform:
+        """Frame transform at a search scale"""
+        transform = self._transforms.get(scale)
+        if transform is None:
+            size = self.size_at(scale)
+            if size == self.source:
+                transform = FrameTransform(None, 1)
+            else:
+                transform = FrameTransform(size, reduce_factor(self.source, size))
+            self._transforms[scale] = transform
+        return transform
@@ -0,0 +1,171 @@
+import os
+import secrets
+import shutil
+import struct
+from pathlib import Path
+from typing import Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# Linux ioctl sharing the source's extents with the destination (reflink)
+FICLONE = 0x40049409
+
+COPY_CHUNK = 1 << 30
+
+
+def _create_temp(destination: Path) -> Tuple[int, str]:
+    """
+    Create a hidden temporary file next to destination
+
+    Unlike mkstemp the file gets the usual permissions (0666 minus umask),
+    so the renamed output is as readable as a directly written one.
+    """
+    while True:
+        name = _temp_name(destination)
+        try:
+            return os.open(name, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666), str(name)
+        except FileExistsError:
+            continue
+
+
+def _temp_name(destination: Path) -> Path:
+    return destination.parent / f".{destination.name}.{secrets.token_hex(4)}.tmp"
+
+
+def _fsync_directory(directory: Path):
+    """Persist a rename; skipped where directories cannot be opened (Windows)"""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def atomic_write(path: Path, data: bytes, fsync: bool = False):
+    """
+    Write data to a temporary file next to path and rename it into place
+
+    Readers see either the previous file or the complete new one, never a
+    partial write. With fsync the data and the rename are flushed to disk
+    before returning.
+    """
+    fd, temp_name = _create_temp(path)
+    try:
+        with os.fdopen(fd, "wb") as fp:
+            fp.write(data)
+            if fsync:
+                fp.flush()
+                os.fsync(fp.fileno())
+        os.replace(temp_name, path)
+    except BaseException:
+        Path(temp_name).unlink(missing_ok=True)
+        raise
+    if fsync:
+        _fsync_directory(path.parent)
+
+
+def _reflink(src, dst) -> bool:
+    """Clone src into dst on filesystems that support it (Btrfs, XFS, ...)"""
+    if fcntl is None:
+        return False
+    try:
+        fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+    except OSError:
+        return False
+    return True
+
+
+def _copy_range(src, dst) -> bool:
+    """Copy with copy_file_range, inside the kernel; False if unsupported"""
+    if not hasattr(os, "copy_file_range"):
+        return False
+    try:
+        while os.copy_file_range(src.fileno(), dst.fileno(), COPY_CHUNK):
+            pass
+    except OSError:
+        # Unsupported here (e.g. across filesystems on older kernels):
+        # start over with a plain copy
+        src.seek(0)
+        dst.seek(0)
+        dst.truncate()
+        return False
+    return True
+
+
+def atomic_copy(source: Path, destination: Path, fsync: bool = False) -> int:
+    """
+    Copy source to a temporary file next to destination and rename it into place
+
+    The copy is a reflink where the filesystem supports it, otherwise a
+    kernel-side copy_file_range, falling back to a plain read/write copy.
+
+    Returns:
+        Number of bytes copied
+    """
+    fd, temp_name = _create_temp(destination)
+    try:
+        with open(source, "rb") as src, os.fdopen(fd, "wb") as dst:
+            if not (_reflink(src, dst) or _copy_range(src, dst)):
+                shutil.copyfileobj(src, dst)
+            dst.seek(0, os.SEEK_END)
+            size = dst.tell()
+            if fsync:
+                dst.flush()
+                os.fsync(dst.fileno())
+        os.replace(temp_name, destination)
+    except BaseException:
+        Path(temp_name).unlink(missing_ok=True)
+        raise
+    if fsync:
+        _fsync_directory(destination.parent)
+    return size
+
+
+def atomic_link(source: Path, destination: Path, fsync: bool = False) -> bool:
+    """
+    Hard link source to destination, replacing it atomically
+
+    The two paths then share one file: writing to either in place changes
+    both (atomic_write and atomic_copy replace files, so they do not).
+
+    Returns:
+        False if the filesystem cannot link the two paths (e.g. they are on
+        different devices)
+    """
+    while True:
+        temp_name = _temp_name(destination)
+        try:
+            os.link(source, temp_name)
+            break
+        except FileExistsError:
+            continue
+        except OSError:
+            return False
+    try:
+        os.replace(temp_name, destination)
+    except BaseException:
+        Path(temp_name).unlink(missing_ok=True)
+        raise
+    if fsync:
+        _fsync_directory(destination.parent)
+    return True
+
+
+def read_gif_size(path: Path) -> Optional[Tuple[int, int]]:
+    """Logical screen size from a GIF header, or None if path is not a GIF"""
+    try:
+        with open(path, "rb") as fp:
+            header = fp.read(10)
+    except OSError:
+        return None
+    if len(header) < 10 or header[:6] not in (b"GIF87a", b"GIF89a"):
+        return None
+    return struct.unpack("<HH", header[6:10])
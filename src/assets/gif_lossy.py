@@ -0,0 +1,91 @@
+from typing import Optional
+
+import numpy as np
+from PIL import Image
+
+# RGB distance allowed per quality point below 100 (quality 85 -> 12)
+ERROR_PER_QUALITY = 0.8
+
+
+def tolerance_for_quality(quality: int) -> float:
+    """Largest RGB distance lossy mode may add at a quality (100 = lossless)"""
+    return max(0, 100 - quality) * ERROR_PER_QUALITY
+
+
+def lossy_indices(
+    indices: np.ndarray,
+    rgb: np.ndarray,
+    palette: np.ndarray,
+    tolerance: float,
+    transparency: Optional[int] = None,
+) -> np.ndarray:
+    """
+    Extend runs of palette indices where the color error allows
+
+    GIF's LZW codes grow by one pixel each time a sequence repeats, so long
+    runs of one index compress to a few codes. A pixel takes the index
+    written to its left when that palette color is within tolerance of the
+    pixel's true color. The error is always measured against the true color,
+    so it never accumulates along a run. Columns are processed left to right
+    (each depends on the previous output column), every column as one
+    vectorized step over all rows. Transparent pixels are left alone and
+    never extended into.
+
+    Args:
+        indices: (H, W) palette indices
+        rgb: (H, W, 3) true colors of the pixels
+        palette: (N, 3) palette the indices refer to
+        tolerance: Largest RGB distance allowed (0 returns indices unchanged)
+        transparency: Transparent index, if any
+
+    Returns:
+        (H, W) uint8 indices
+    """
+    if tolerance <= 0 or indices.shape[1] < 2:
+        return indices
+
+    # Column-major copies, so every column is a contiguous row
+    out = np.ascontiguousarray(indices.T)
+    colors = np.ascontiguousarray(rgb.transpose(1, 0, 2), dtype=np.int32)
+    palette = palette.astype(np.int32)
+    limit = tolerance * tolerance
+
+    for x in range(1, out.shape[0]):
+        left = out[x - 1]
+        column = out[x]
+        candidates = left != column
+        if transparency is not None:
+            candidates &= (left != transparency) & (column != transparency)
+        ys = np.flatnonzero(candidates)
+        if not ys.size:
+            continue
+        error = ((colors[x, ys] - palette[left[ys]]) ** 2).sum(axis=1)
+        accepted = ys[error <= limit]
+        column[accepted] = left[accepted]
+    return np.ascontiguousarray(out.T)
+
+
+def lossy_image(
+    im: Image.Image,
+    frame: Image.Image,
+    tolerance: float,
+    transparency: Optional[int] = None,
+) -> Image.Image:
+    """
+    Apply lossy_indices to a palette image
+
+    Args:
+        im: Palette-mode image quantized from frame
+        frame: The RGBA (or RGB) frame im was quantized from
+        tolerance: Largest RGB distance allowed
+        transparency: Transparent index of im, if any
+    """
+    if tolerance <= 0:
+        return im
+    palette = np.array(im.getpalette(), dtype=np.uint8).reshape(-1, 3)
+    rgb = np.asarray(frame.convert("RGB"))
+    indices = lossy_indices(np.asarray(im), rgb, palette, tolerance, transparency)
+
+    result = Image.fromarray(indices)
+    result.putpalette(im.getpalette())
+    return result
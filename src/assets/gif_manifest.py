@@ -0,0 +1,154 @@
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.assets.gif_io import atomic_write
+
+MANIFEST_NAME = ".gif_optimizer_manifest.json"
+MANIFEST_VERSION = 1
+
+READ_CHUNK = 1 << 20
+
+
+@dataclass
+class ManifestEntry:
+    """What was produced from one input file"""
+
+    size: int
+    mtime_ns: int
+    content_hash: str
+    config_hash: str
+    output: str
+    output_size: int
+
+
+def hash_file(path: Path) -> str:
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as fp:
+        for chunk in iter(lambda: fp.read(READ_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_settings(settings: Dict[str, Any]) -> str:
+    """Stable hash of the settings that determine an output"""
+    return hashlib.sha256(json.dumps(settings, sort_keys=True).encode()).hexdigest()
+
+
+class ProcessingManifest:
+    """
+    Record of previous runs kept in the output folder
+
+    Entries are keyed by the input path relative to the input folder. A file
+    is up to date when its size and mtime match the entry (or, if they do not,
+    its content hash still does), the settings hash matches and the output
+    still exists.
+    """
+
+    def __init__(self, output_folder: Path):
+        self.output_folder = Path(output_folder)
+        self.path = self.output_folder / MANIFEST_NAME
+        self.entries: Dict[str, ManifestEntry] = {}
+
+    def load(self) -> "ProcessingManifest":
+        """Read the manifest from disk; a missing or unreadable one starts empty"""
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            if data.get("version") == MANIFEST_VERSION:
+                self.entries = {
+                    key: ManifestEntry(**entry)
+                    for key, entry in data.get("files", {}).items()
+                }
+        except (OSError, ValueError, TypeError):
+            self.entries = {}
+        return self
+
+    def save(self):
+        """Write the manifest atomically"""
+        data = {
+            "version": MANIFEST_VERSION,
+            "files": {key: asdict(entry) for key, entry in self.entries.items()},
+        }
+        atomic_write(self.path, json.dumps(data, indent=1).encode("utf-8"))
+
+    def is_current(self, key: str, input_path: Path, config_hash: str) -> bool:
+        """
+        True if input_path was already processed with the same settings
+
+        An input that cannot be read (e.g. deleted since it was found) is not
+        current, so it is processed and fails or succeeds like any other.
+        """
+        entry = self.entries.get(key)
+        if entry is None or entry.config_hash != config_hash:
+            return False
+        if not (self.output_folder / entry.output).exists():
+            return False
+
+        try:
+            stat = input_path.stat()
+            if stat.st_size == entry.size and stat.st_mtime_ns == entry.mtime_ns:
+                return True
+
+            # Touched but possibly unchanged: fall back to the content hash
+            if stat.st_size != entry.size:
+                return False
+            if hash_file(input_path) != entry.content_hash:
+                return False
+        except OSError:
+            return False
+        entry.mtime_ns = stat.st_mtime_ns
+        return True
+
+    def record(
+        self,
+        key: str,
+        input_path: Path,
+        config_hash: str,
+        output_path: Path,
+        output_size: Optional[int] = None,
+    ):
+        """
+        Remember a successfully processed file (output_size saves a stat)
+
+        Nothing is recorded if the input or output is gone by now (e.g. the
+        source was deleted mid-run); the file is then redone next time.
+        """
+        try:
+            if output_size is None:
+                output_size = output_path.stat().st_size
+            stat = input_path.stat()
+            content_hash = hash_file(input_path)
+        except OSError:
+            return
+        self.entries[key] = ManifestEntry(
+            size=stat.st_size,
+            mtime_ns=stat.st_mtime_ns,
+            content_hash=content_hash,
+            config_hash=config_hash,
+            output=output_path.relative_to(self.output_folder).as_posix(),
+            output_size=output_size,
+        )
+
+    def prune(self, present: Iterable[str]) -> List[str]:
+        """
+        Forget inputs that no longer exist and delete their outputs
+
+        Args:
+            present: Keys of the inputs found in this run
+
+        Returns:
+            Keys of the removed entries
+        """
+        present = set(present)
+        removed = [key for key in self.entries if key not in present]
+        for key in removed:
+            entry = self.entries.pop(key)
+            try:
+                os.remove(self.output_folder / entry.output)
+            except FileNotFoundError:
+                pass
+        return removed
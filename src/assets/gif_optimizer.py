@@ -1,12 +1,53 @@
+import io
 import os
 import logging
 import threading
-from typing import Optional, Callable, Dict, Any, List
-from dataclasses import dataclass
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    CancelledError,
+    Future,
+    ProcessPoolExecutor,
+    wait,
+)
+from itertools import chain, islice
+from typing import Optional, Callable, Dict, Any, Iterator, Sequence, Tuple
+from dataclasses import asdict, dataclass, replace
 from pathlib import Path
 from PIL import Image, ImageSequence
 import math
 
+from src.assets.gif_cache import ResultCache
+from src.assets.gif_cancel import CancelToken, OptimizationCancelled
+from src.assets.gif_discovery import WalkAhead, walk_gif_files
+from src.assets.gif_dither import DITHER_MODES
+from src.assets.gif_formats import (
+    AUTO_FORMAT,
+    FORMAT_SUFFIX,
+    OUTPUT_FORMATS,
+    AnimationWriter,
+    save_still,
+    sniff_format,
+)
+from src.assets.gif_geometry import FrameTransform, GeometryPlan
+from src.assets.gif_io import atomic_copy, atomic_link, atomic_write, read_gif_size
+from src.assets.gif_lossy import lossy_image, tolerance_for_quality
+from src.assets.gif_manifest import ProcessingManifest, hash_settings
+from src.assets.gif_palette import PaletteMapper, median_cut, sample_pixels
+from src.assets.gif_probe import ProbeIndex, probe_gif
+from src.assets.gif_progress import BatchProgress, ProgressTracker
+from src.assets.gif_results import FileResult, ResultAggregator
+from src.assets.gif_quality import MAX_PSNR, QualityReference
+from src.assets.gif_search import SearchResult, search_encoding, search_quality
+from src.assets.gif_trace import StageTimer, write_chrome_trace
+from src.assets.gif_stream import (
+    DuplicateFrameFilter,
+    GifStreamWriter,
+    decode_frames,
+    estimate_decoded_bytes,
+    quantize_frame,
+    resize_frames,
+)
+
 
 @dataclass
 class OptimizationConfig:
@@ -20,6 +61,18 @@ class OptimizationConfig:
     optimize: bool = True
     preserve_animation: bool = True
     backup_original: bool = True
+    max_encodes: int = 8  # Encode budget of the target-size search per file
+    frame_diff: bool = True  # Encode only the changed region of each frame
+    global_palette: bool = True  # Share one palette across all frames
+    collapse_duplicates: bool = True  # Merge repeated frames, summing durations
+    duplicate_tolerance: int = 0  # Max channel difference for near-duplicates
+    output_format: str = "gif"  # gif, webp, apng, or auto to keep the best
+    lossy: bool = False  # Trade color error (set by quality) for smaller GIFs
+    dither: str = "none"  # none, ordered or floyd-steinberg
+    dither_strength: float = 1.0  # 0-1, scales the dither noise or error
+    measure_quality: bool = False  # Report SSIM/PSNR of every output
+    min_ssim: float = 0.0  # Smallest output keeping this SSIM (0 = size target)
+    passthrough: bool = True  # Keep sources that re-encoding would not improve
 
 
 class GifOptimizationError(Exception):
@@ -28,6 +81,24 @@ class GifOptimizationError(Exception):
     pass
 
 
+# Completed files between manifest saves during incremental runs
+MANIFEST_SAVE_INTERVAL = 100
+
+# Assumed encodes per file for in-file progress until files have completed
+DEFAULT_EXPECTED_ENCODES = 3
+
+# Files submitted to the pool per worker; discovery feeds more as they finish
+PENDING_PER_WORKER = 2
+
+
+def default_worker_count() -> int:
+    """Number of CPU cores available to this process"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
 class GifOptimizer:
     """
     Production-level GIF optimizer with advanced features
@@ -40,6 +111,21 @@ class GifOptimizer:
         output_folder: Optional[str] = None,
         config: Optional[OptimizationConfig] = None,
         progress_callback: Optional[Callable[[int], None]] = None,
+        max_workers: Optional[int] = None,
+        cache_dir: Optional[str] = None,
+        cache_max_mb: int = 1024,
+        incremental: bool = False,
+        trace_path: Optional[str] = None,
+        report_path: Optional[str] = None,
+        cancel_token: Optional[CancelToken] = None,
+        status_callback: Optional[Callable[[BatchProgress], None]] = None,
+        recursive: bool = False,
+        include: Optional[Sequence[str]] = None,
+        exclude: Optional[Sequence[str]] = None,
+        follow_symlinks: bool = False,
+        memory_budget_mb: int = 2048,
+        fsync: bool = False,
+        hardlink: bool = False,
     ):
         """
         Initialize the GIF optimizer
@@ -49,7 +135,28 @@ class GifOptimizer:
             target_size_kb: Target file size in KB
             output_folder: Output folder (defaults to input_folder/optimized)
             config: Optimization configuration
-            progress_callback: Callback function for progress updates
+            progress_callback: Callback function for progress updates (percent)
+            max_workers: Worker processes for batch runs (defaults to CPU count,
+                1 processes files sequentially in the calling process)
+            cache_dir: Directory of the result cache (None disables caching)
+            cache_max_mb: Size cap of the result cache in MB
+            incremental: Only process files that are new or changed since the
+                last run, tracked by a manifest in the output folder
+            trace_path: Write a Chrome trace-event JSON of the batch here
+            report_path: Stream per-file results to this JSONL (or .csv) report
+            cancel_token: Token used to pause or cancel a running batch
+            status_callback: Receives BatchProgress (files, throughput, ETA)
+                alongside progress_callback, at most 20 times per second
+            recursive: Also process subfolders; their structure is mirrored
+                in the output folder
+            include: Globs of relative paths to process (default: all GIFs)
+            exclude: Globs of relative file or folder paths to leave out
+            follow_symlinks: Follow symlinked files and folders
+            memory_budget_mb: Estimated decoded-frame memory allowed across
+                all worker processes; large files wait for room in the pool
+            fsync: Flush every output to disk before renaming it into place
+            hardlink: Hard link sources that need no optimization into the
+                output folder instead of copying them
         """
         self.input_folder = Path(input_folder)
         self.target_size_kb = target_size_kb
@@ -57,7 +164,51 @@ class GifOptimizer:
             Path(output_folder) if output_folder else self.input_folder / "optimized"
         )
         self.config = config or OptimizationConfig(target_size_kb=target_size_kb)
+        if self.config.output_format == AUTO_FORMAT:
+            self.formats = OUTPUT_FORMATS
+        elif self.config.output_format in OUTPUT_FORMATS:
+            self.formats = (self.config.output_format,)
+        else:
+            raise ValueError(
+                f"Unknown output format {self.config.output_format!r}, expected "
+                f"one of {', '.join(OUTPUT_FORMATS + (AUTO_FORMAT,))}"
+            )
+        if self.config.dither not in DITHER_MODES:
+            raise ValueError(
+                f"Unknown dither mode {self.config.dither!r}, expected "
+                f"one of {', '.join(DITHER_MODES)}"
+            )
         self.progress_callback = progress_callback
+        self.status_callback = status_callback
+        self._progress: Optional[ProgressTracker] = None
+        self._frames_seen = 0
+        self._frames_expected = 1
+        self.max_workers = max(1, max_workers or default_worker_count())
+        self.cache_dir = cache_dir
+        self.cache_max_mb = cache_max_mb
+        self.cache = (
+            ResultCache(cache_dir, cache_max_mb * 1024 * 1024) if cache_dir else None
+        )
+        self.incremental = incremental
+        self._manifest: Optional[ProcessingManifest] = None
+        self._probes: Optional[ProbeIndex] = None
+        self.trace_path = trace_path
+        self.report_path = report_path
+        self.cancel_token = cancel_token
+        self.recursive = recursive
+        self.include = include
+        self.exclude = exclude
+        self.follow_symlinks = follow_symlinks
+        self.memory_budget = memory_budget_mb * 1024 * 1024
+        self.fsync = fsync
+        self.hardlink = hardlink
+        # Encodes go here; only the accepted candidate is ever written to disk
+        self._buffer = io.BytesIO()
+        self._walk_complete = False
+        self._timer = StageTimer()
+        self._result = FileResult("")
+        self._plan = GeometryPlan((1, 1))
+        self._reference: Optional[QualityReference] = None
 
         # Setup logging
         self._setup_logging()
@@ -66,14 +217,35 @@ class GifOptimizer:
         self.output_folder.mkdir(exist_ok=True)
 
         # Statistics
-        self.stats = {
-            "processed": 0,
-            "successful": 0,
-            "failed": 0,
-            "total_original_size": 0,
-            "total_optimized_size": 0,
+        self.results = ResultAggregator(report_path, keep_trace=trace_path is not None)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of the processing statistics"""
+        return self.results.summary()
+
+    def _worker_args(self) -> Dict[str, Any]:
+        """Picklable constructor arguments used to rebuild this optimizer in a worker"""
+        return {
+            "input_folder": str(self.input_folder),
+            "target_size_kb": self.target_size_kb,
+            "output_folder": str(self.output_folder),
+            "config": self.config,
+            "max_workers": 1,
+            "cache_dir": self.cache_dir,
+            "cache_max_mb": self.cache_max_mb,
+            "trace_path": self.trace_path,
+            "cancel_token": self.cancel_token,
+            "fsync": self.fsync,
+            "hardlink": self.hardlink,
         }
 
+    def _cache_settings(self) -> Dict[str, Any]:
+        """Effective settings that determine the output, used in cache keys"""
+        settings = asdict(self.config)
+        settings["target_size_kb"] = self.target_size_kb
+        return settings
+
     def _setup_logging(self):
         """Setup logging configuration"""
         logging.basicConfig(
@@ -91,11 +263,106 @@ class GifOptimizer:
         if self.progress_callback:
             self.progress_callback(percentage)
 
-    def _get_gif_files(self) -> List[Path]:
-        """Get all GIF files from input folder"""
-        gif_files = list(self.input_folder.glob("*.gif"))
-        gif_files.extend(self.input_folder.glob("*.GIF"))
-        return sorted(gif_files)
+    def _emit_progress(self, progress: BatchProgress):
+        """Forward a (rate-limited) progress report to the callbacks"""
+        # Percentages are only meaningful once the whole batch is known
+        if self._walk_complete:
+            self._update_progress(progress.percent)
+        if self.status_callback:
+            self.status_callback(progress)
+
+    def _expected_encodes(self) -> float:
+        """Average encodes per file so far, used to weigh in-file progress"""
+        counters = self.results.counters
+        if not counters["processed"]:
+            return DEFAULT_EXPECTED_ENCODES
+        return max(1.0, counters["search_iterations"] / counters["processed"])
+
+    def _frame_progress(self):
+        """Advance the current file's progress by one encoded frame"""
+        if self._progress:
+            self._frames_seen += 1
+            self._progress.update_file(
+                min(0.95, self._frames_seen / self._frames_expected)
+            )
+
+    def _encode_buffer(self) -> io.BytesIO:
+        """The reusable in-memory encode buffer, emptied"""
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return self._buffer
+
+    def _memory_estimate(self, path: Path) -> int:
+        """Decoded-frame memory needed to optimize path, from its probe"""
+        probe = self._probes.get(path) if self._probes else probe_gif(path)
+        if probe is None:
+            # Unreadable files fail quickly in the worker
+            return 0
+        memory = estimate_decoded_bytes(probe.width, probe.height, probe.frames)
+        if (
+            probe.frames > 1
+            and self.config.preserve_animation
+            and any(fmt != "gif" for fmt in self.formats)
+        ):
+            # WebP and APNG writers hold every output frame until close()
+            plan = GeometryPlan(
+                (probe.width, probe.height),
+                self.config.max_width,
+                self.config.max_height,
+            )
+            memory += plan.base[0] * plan.base[1] * 4 * probe.frames
+        return memory
+
+    @staticmethod
+    def _file_size(path: Path) -> int:
+        try:
+            return path.stat().st_size
+        except OSError:
+            return 0
+
+    def _check_cancel(self):
+        """Wait while paused and raise OptimizationCancelled once cancelled"""
+        if self.cancel_token:
+            self.cancel_token.check()
+
+    def _discover_files(self) -> Iterator[Path]:
+        """Stream the GIF files of the input folder as the walk finds them"""
+        self._walk_complete = False
+        # Outputs nested in the input folder are not inputs; an output folder
+        # that is the input folder itself must still be walked
+        output = self.output_folder.resolve()
+        inside = self.input_folder.resolve() in output.parents
+        count = 0
+        for gif_file in walk_gif_files(
+            self.input_folder,
+            recursive=self.recursive,
+            include=self.include,
+            exclude=self.exclude,
+            follow_symlinks=self.follow_symlinks,
+            skip_dirs=[output] if inside else [],
+        ):
+            count += 1
+            yield gif_file
+        self._walk_complete = True
+        self.logger.info(f"Found {count} GIF files")
+
+    def _track_progress(self, gif_files: Iterator[Path]) -> Iterator[Path]:
+        """Add files to the progress total as the walk finds them"""
+        for gif_file in gif_files:
+            self._progress.add_total(1, self._file_size(gif_file))
+            yield gif_file
+
+    def _output_path(self, input_path: Path, fmt: str = "gif") -> Path:
+        """Where the optimized version of input_path is written in format fmt"""
+        relative = input_path.relative_to(self.input_folder)
+        name = relative.name
+        if fmt != "gif":
+            name = Path(name).with_suffix(FORMAT_SUFFIX[fmt]).name
+        return self.output_folder / relative.parent / f"optimized_{name}"
+
+    def _manifest_key(self, input_path: Path) -> str:
+        """Manifest key of an input file: its path relative to the input folder"""
+        return input_path.relative_to(self.input_folder).as_posix()
 
     def _calculate_scale_factor(self, original_size: int, target_size: int) -> float:
         """Calculate optimal scale factor based on file size"""
@@ -121,29 +388,126 @@ class GifOptimizer:
         Returns:
             bool: True if optimization was successful
         """
+        result = self._process_file(input_path)
+        self.results.add(result)
+        return result.success
+
+    def _process_file(self, input_path: Path) -> FileResult:
+        """Optimize a single GIF file and return its result record"""
+        self._result = FileResult(str(input_path))
+        self._timer = StageTimer(trace=self.trace_path is not None)
+
+        try:
+            with self._timer.stage("file", file=input_path.name):
+                self._result.success = self._optimize_file(input_path)
+        finally:
+            timer = self._timer
+            self._result.seconds = timer.totals["file"]
+            self._result.stage_times = dict(timer.totals)
+            self._result.stage_means = timer.per_call()
+            self._result.trace_events = timer.events
+        return self._result
+
+    def _optimize_file(self, input_path: Path) -> bool:
+        """Body of _optimize_single_gif, timed as one "file" stage"""
         try:
-            output_path = self.output_folder / f"optimized_{input_path.name}"
+            self._output_path(input_path).parent.mkdir(parents=True, exist_ok=True)
 
             # Get original file size
-            original_size = input_path.stat().st_size / 1024  # Convert to KB
-            self.stats["total_original_size"] += original_size
+            self._result.input_size = input_path.stat().st_size
+            original_size = self._result.input_size / 1024  # Convert to KB
 
             self.logger.info(f"Processing: {input_path.name} ({original_size:.1f} KB)")
 
+            if self._already_compliant(input_path):
+                with self._timer.stage("passthrough"):
+                    self._pass_through(input_path)
+                self.logger.info(f"Already under target: {input_path.name}")
+                return True
+
+            cache_key = None
+            if self.cache:
+                with self._timer.stage("cache"):
+                    cache_key = self.cache.make_key(input_path, self._cache_settings())
+                    cached_size = None
+                    header = self.cache.peek(cache_key)
+                    if header is not None:
+                        fmt = sniff_format(header)
+                        output_path = self._output_path(input_path, fmt)
+                        cached_size = self.cache.get(cache_key, output_path, self.fsync)
+                self._result.cached = cached_size is not None
+                if cached_size is not None:
+                    self._result.output_size = cached_size
+                    self._result.format = fmt
+                    self._result.output = str(output_path)
+                    self.logger.info(f"Cache hit: {output_path.name}")
+                    return True
+
             with Image.open(input_path) as img:
                 # Check if animated
-                is_animated = hasattr(img, "n_frames") and img.n_frames > 1
+                with self._timer.stage("open"):
+                    self._result.frames = getattr(img, "n_frames", 1)
+                    is_animated = self._result.frames > 1
+                self._result.width, self._result.height = img.size
 
-                if is_animated and self.config.preserve_animation:
-                    success = self._optimize_animated_gif(
-                        img, output_path, original_size
+                # Output geometry is planned once per file
+                self._plan = GeometryPlan(
+                    img.size, self.config.max_width, self.config.max_height
+                )
+                if self._plan.clamped:
+                    self.logger.info(
+                        f"Clamping {img.width}x{img.height} to "
+                        f"{self._plan.base[0]}x{self._plan.base[1]}"
                     )
+
+                self._reference = None
+                if self.config.measure_quality or self._quality_mode:
+                    with self._timer.stage("quality"):
+                        self._reference = QualityReference(img)
+
+                if is_animated and self.config.preserve_animation:
+                    chosen = self._optimize_animated_gif(img, original_size)
                 else:
-                    success = self._optimize_static_gif(img, output_path, original_size)
+                    chosen = self._optimize_static_gif(img, original_size)
+
+                if chosen:
+                    fmt, result = chosen
+                    self._record_search(result)
+                    # Never write an "optimized" file bigger than its source;
+                    # in quality mode the source also beats a missed floor
+                    if self._quality_mode and not result.fits:
+                        worse = "misses the quality floor"
+                    elif len(result.data) > self._result.input_size:
+                        worse = "is larger"
+                    else:
+                        worse = None
+                    if worse and self._source_acceptable(fmt):
+                        self.logger.info(
+                            f"Keeping source of {input_path.name}: re-encoded "
+                            f"{len(result.data) / 1024:.1f} KB {worse}"
+                        )
+                        with self._timer.stage("write"):
+                            self._pass_through(input_path)
+                        if cache_key:
+                            with self._timer.stage("cache"):
+                                self.cache.put(cache_key, input_path.read_bytes())
+                        return True
+
+                    output_path = self._output_path(input_path, fmt)
+                    with self._timer.stage("write"):
+                        atomic_write(output_path, result.data, self.fsync)
+                    if self._reference:
+                        with self._timer.stage("quality"):
+                            quality = self._reference.compare(result.data)
+                        self._result.ssim, self._result.psnr = quality
+                    self._result.format = fmt
+                    self._result.output = str(output_path)
+                    if cache_key:
+                        with self._timer.stage("cache"):
+                            self.cache.put(cache_key, result.data)
 
-                if success:
-                    optimized_size = output_path.stat().st_size / 1024
-                    self.stats["total_optimized_size"] += optimized_size
+                    self._result.output_size = len(result.data)
+                    optimized_size = self._result.output_size / 1024
                     compression_ratio = (1 - optimized_size / original_size) * 100
 
                     self.logger.info(
@@ -151,103 +515,367 @@ class GifOptimizer:
                         f"({original_size:.1f} KB → {optimized_size:.1f} KB, "
                         f"{compression_ratio:.1f}% reduction)"
                     )
+                    if self._result.ssim is not None:
+                        self.logger.info(
+                            f"Quality: SSIM {self._result.ssim:.4f}, "
+                            f"PSNR {self._result.psnr:.1f} dB"
+                        )
+                    if not result.fits and self._quality_mode:
+                        self.logger.warning(
+                            f"{input_path.name} could not keep SSIM "
+                            f"{self.config.min_ssim} within "
+                            f"{result.iterations} encodes"
+                        )
+                    elif not result.fits:
+                        self.logger.warning(
+                            f"{input_path.name} could not reach "
+                            f"{self.target_size_kb} KB within "
+                            f"{result.iterations} encodes"
+                        )
 
-                    self.stats["successful"] += 1
                     return True
                 else:
-                    self.stats["failed"] += 1
                     return False
 
+        except OptimizationCancelled:
+            raise
         except Exception as e:
             self.logger.error(f"Error processing {input_path.name}: {str(e)}")
-            self.stats["failed"] += 1
+            self._result.error = str(e)
+            return False
+
+    def _already_compliant(self, input_path: Path) -> bool:
+        """
+        True if the source can be used as is, judged without decoding it
+
+        That is the case when passthrough is enabled, the output format is
+        GIF, a size target is set, animation is preserved, the file is no
+        larger than the target and its header's logical screen fits within
+        max_width x max_height.
+        """
+        if (
+            not self.config.passthrough
+            or self.config.output_format != "gif"
+            or self._quality_mode
+            or not self.config.preserve_animation
+            or self._result.input_size > self.target_size_kb * 1024
+        ):
+            return False
+        size = read_gif_size(input_path)
+        if size is None:
+            return False
+        plan = GeometryPlan(size, self.config.max_width, self.config.max_height)
+        if plan.clamped:
             return False
+        self._result.width, self._result.height = size
+        return True
+
+    def _source_acceptable(self, fmt: str) -> bool:
+        """
+        True if the source itself satisfies the output constraints
+
+        Checked once the file is open: a GIF is wanted (the chosen format is
+        GIF, or any format may be picked), its size fits the max box and,
+        when animation is not preserved, it is not animated.
+        """
+        if not self.config.passthrough:
+            return False
+        if fmt != "gif" and self.config.output_format != AUTO_FORMAT:
+            return False
+        return not self._plan.clamped and (
+            self.config.preserve_animation or self._result.frames <= 1
+        )
+
+    def _pass_through(self, input_path: Path):
+        """Use the source file unchanged as the output"""
+        output_path = self._output_path(input_path)
+        if not (self.hardlink and atomic_link(input_path, output_path, self.fsync)):
+            atomic_copy(input_path, output_path, self.fsync)
+
+        record = self._result
+        record.passthrough = True
+        record.output_size = record.input_size
+        record.output_width, record.output_height = record.width, record.height
+        record.scale = 1.0
+        record.frames_dropped = 0
+        record.fits = (
+            self._quality_mode or record.input_size <= self.target_size_kb * 1024
+        )
+        record.format = "gif"
+        record.output = str(output_path)
+        if self.config.measure_quality or self._quality_mode:
+            record.ssim, record.psnr = 1.0, MAX_PSNR
+
+    def _record_search(self, result: SearchResult):
+        """Record the outcome of a target-size search in the file's result"""
+        record = self._result
+        record.iterations = result.iterations
+        record.search_time = result.seconds
+        record.scale = result.scale
+        record.colors = result.colors
+        record.fits = result.fits
+        record.output_width, record.output_height = self._plan.size_at(result.scale)
+
+    @property
+    def _quality_mode(self) -> bool:
+        """True if outputs are sized by a quality floor instead of a byte target"""
+        return self.config.min_ssim > 0
+
+    def _measure_ssim(self, data: bytes) -> float:
+        """SSIM of an encoded candidate against the current file"""
+        with self._timer.stage("quality"):
+            return self._reference.compare(data)[0]
+
+    def _search(
+        self,
+        original_size: float,
+        encode: Callable[[FrameTransform, int], bytes],
+    ) -> Optional[SearchResult]:
+        """
+        Search scale and palette size for the largest output under target
+
+        In quality mode the search instead looks for the smallest output
+        whose SSIM stays at or above config.min_ssim, and the target size is
+        not used. Scales are relative to the size planned for the file,
+        which already fits the max_width x max_height box.
+
+        Args:
+            original_size: Source file size in KB
+            encode: Callable encoding the image with (frame transform, colors)
+        """
+
+        def encode_at(scale: float, colors: int) -> bytes:
+            return encode(self._plan.transform(scale), colors)
+
+        if self._quality_mode:
+            return search_quality(
+                encode_at,
+                self._measure_ssim,
+                min_quality=self.config.min_ssim,
+                colors=self.config.colors,
+                max_encodes=self.config.max_encodes,
+            )
+
+        # Clamping alone shrinks the output roughly with the pixel count
+        expected_size = original_size * self._plan.area_ratio
+        return search_encoding(
+            encode_at,
+            target_bytes=self.target_size_kb * 1024,
+            initial_scale=self._calculate_scale_factor(
+                expected_size, self.target_size_kb
+            ),
+            colors=self.config.colors,
+            max_encodes=self.config.max_encodes,
+        )
+
+    def _search_formats(
+        self,
+        original_size: float,
+        encode: Callable[[str, FrameTransform, int], bytes],
+    ) -> Optional[Tuple[str, SearchResult]]:
+        """
+        Run the target-size search once per output format and keep the best
+
+        Candidates are ranked by fitting the target, then by scale and palette
+        size (what the search had to give up), then by size; formats that all
+        fit at full quality are therefore decided by the smallest output. In
+        quality mode, the smallest output keeping the SSIM floor wins.
+        Iterations and search time cover every format tried.
+
+        Args:
+            original_size: Source file size in KB
+            encode: Callable encoding the image with (format, transform, colors)
+
+        Returns:
+            (format, search result) of the chosen candidate
+        """
+        best: Optional[Tuple[str, SearchResult]] = None
+        iterations = 0
+        seconds = 0.0
+        for fmt in self.formats:
+            result = self._search(
+                original_size,
+                lambda transform, colors, fmt=fmt: encode(fmt, transform, colors),
+            )
+            if result is None:
+                continue
+            iterations += result.iterations
+            seconds += result.seconds
+            if self._quality_mode:
+                rank = (result.fits, -len(result.data))
+            else:
+                rank = (result.fits, result.scale, result.colors, -len(result.data))
+            if best is None or rank > best[0]:
+                best = (rank, fmt, result)
+
+        if best is None:
+            return None
+        _, fmt, result = best
+        if len(self.formats) > 1:
+            self.logger.info(f"Chose {fmt} ({len(result.data) / 1024:.1f} KB)")
+        return fmt, replace(result, iterations=iterations, seconds=seconds)
+
+    def _format_quality(self, colors: int) -> int:
+        """
+        WebP quality for a search candidate
+
+        WebP has no palette, so the search's palette halving lowers the
+        quality proportionally instead.
+        """
+        return max(1, round(self.config.quality * colors / max(1, self.config.colors)))
+
+    def _lossy_tolerance(self) -> float:
+        """RGB error lossy GIF encoding may add (0 when lossy mode is off)"""
+        if not self.config.lossy:
+            return 0
+        return tolerance_for_quality(self.config.quality)
 
     def _optimize_static_gif(
-        self, img: Image.Image, output_path: Path, original_size: int
-    ) -> bool:
+        self, img: Image.Image, original_size: int
+    ) -> Optional[Tuple[str, SearchResult]]:
         """Optimize static GIF"""
         try:
-            # Calculate optimal parameters
-            scale_factor = self._calculate_scale_factor(
-                original_size, self.target_size_kb
-            )
 
-            # Resize if needed
-            if scale_factor < 1.0:
-                new_size = (
-                    int(img.width * scale_factor),
-                    int(img.height * scale_factor),
-                )
-                img = img.resize(new_size, Image.Resampling.LANCZOS)
+            def encode(fmt: str, transform: FrameTransform, colors: int) -> bytes:
+                self._check_cancel()
+                frames = decode_frames(img, self._timer, transform.reduce)
+                frame, _ = next(resize_frames(frames, transform.size, self._timer))
+                buffer = self._encode_buffer()
+                if fmt != "gif":
+                    with self._timer.stage("encode"):
+                        save_still(
+                            frame,
+                            buffer,
+                            fmt,
+                            colors,
+                            self._format_quality(colors),
+                            self.config.dither,
+                            self.config.dither_strength,
+                        )
+                    return buffer.getvalue()
 
-            # Save with optimization
-            img.save(
-                output_path,
-                "GIF",
-                optimize=self.config.optimize,
-                colors=self.config.colors,
-                quality=self.config.quality,
-            )
+                with self._timer.stage("quantize"):
+                    im, transparency = quantize_frame(
+                        frame, colors, self.config.dither, self.config.dither_strength
+                    )
+                if self._lossy_tolerance():
+                    with self._timer.stage("lossy"):
+                        im = lossy_image(
+                            im, frame, self._lossy_tolerance(), transparency
+                        )
+
+                params = {}
+                if transparency is not None:
+                    params["transparency"] = transparency
 
-            return True
+                with self._timer.stage("encode"):
+                    im.save(buffer, "GIF", optimize=self.config.optimize, **params)
+                return buffer.getvalue()
 
+            return self._search_formats(original_size, encode)
+
+        except OptimizationCancelled:
+            raise
         except Exception as e:
             self.logger.error(f"Error optimizing static GIF: {str(e)}")
-            return False
+            self._result.error = str(e)
+            return None
 
     def _optimize_animated_gif(
-        self, img: Image.Image, output_path: Path, original_size: int
-    ) -> bool:
-        """Optimize animated GIF"""
+        self, img: Image.Image, original_size: int
+    ) -> Optional[Tuple[str, SearchResult]]:
+        """
+        Optimize animated GIF
+
+        Frames are decoded, resized and encoded one at a time, so peak memory
+        stays at roughly two frames regardless of frame count (WebP and APNG
+        output holds the resized frames until the encode). Frame durations
+        and the loop count carry over to every format. The cancel token is
+        checked before every frame.
+        """
         try:
-            # Calculate optimal parameters
-            scale_factor = self._calculate_scale_factor(
-                original_size, self.target_size_kb
+            # Shared palettes are built once per palette size and reused
+            # across search candidates
+            palettes: Dict[int, PaletteMapper] = {}
+            samples = None
+            if self.config.global_palette:
+                with self._timer.stage("palette"):
+                    samples = sample_pixels(img)
+            duplicates = DuplicateFrameFilter(
+                self.config.duplicate_tolerance, self._timer
             )
+            # Duplicates are detected on box-reduced frames, so the count
+            # depends on the reduction of the candidate: reduce -> dropped
+            dropped_at: Dict[int, int] = {}
+            self._frames_seen = 0
+            self._frames_expected = (
+                img.n_frames * self._expected_encodes() * len(self.formats)
+            )
+            # Missing means the source plays once
+            loop = img.info.get("loop")
 
-            frames = []
-            durations = []
-
-            # Process each frame
-            for frame_idx in range(img.n_frames):
-                img.seek(frame_idx)
-
-                # Get frame duration
-                duration = img.info.get("duration", 100)
-                durations.append(duration)
+            def encode(fmt: str, transform: FrameTransform, colors: int) -> bytes:
+                palette = None
+                if samples is not None and fmt != "webp":
+                    if colors not in palettes:
+                        with self._timer.stage("palette"):
+                            palettes[colors] = PaletteMapper(
+                                median_cut(samples, max(1, colors - 1))
+                            )
+                    palette = palettes[colors]
 
-                # Resize frame if needed
-                if scale_factor < 1.0:
-                    new_size = (
-                        int(img.width * scale_factor),
-                        int(img.height * scale_factor),
+                # Stream frames straight into the encoder
+                buffer = self._encode_buffer()
+                if fmt == "gif":
+                    writer = GifStreamWriter(
+                        buffer,
+                        loop=loop,
+                        colors=colors,
+                        optimize=self.config.optimize,
+                        diff_frames=self.config.frame_diff,
+                        palette=palette,
+                        lossy=self._lossy_tolerance(),
+                        dither=self.config.dither,
+                        dither_strength=self.config.dither_strength,
+                        timer=self._timer,
                     )
-                    frame = img.resize(new_size, Image.Resampling.LANCZOS)
                 else:
-                    frame = img.copy()
-
-                frames.append(frame)
-
-            # Save optimized animated GIF
-            if frames:
-                frames[0].save(
-                    output_path,
-                    "GIF",
-                    save_all=True,
-                    append_images=frames[1:],
-                    duration=durations,
-                    loop=img.info.get("loop", 0),
-                    optimize=self.config.optimize,
-                    colors=self.config.colors,
-                )
-                return True
+                    writer = AnimationWriter(
+                        buffer,
+                        fmt,
+                        loop=loop,
+                        quality=self._format_quality(colors),
+                        palette=palette,
+                        dither=self.config.dither,
+                        dither_strength=self.config.dither_strength,
+                        timer=self._timer,
+                    )
+                frames = decode_frames(img, self._timer, transform.reduce)
+                if self.config.collapse_duplicates:
+                    # Drop repeats before they are resized
+                    frames = duplicates(frames)
+                frames = resize_frames(frames, transform.size, self._timer)
+                for frame, duration in frames:
+                    self._check_cancel()
+                    writer.add_frame(frame, duration)
+                    self._frame_progress()
+                writer.close()
+                dropped_at[transform.reduce] = duplicates.dropped
+                return buffer.getvalue()
 
-            return False
+            chosen = self._search_formats(original_size, encode)
+            if chosen:
+                reduce = self._plan.transform(chosen[1].scale).reduce
+                self._result.frames_dropped = dropped_at.get(reduce, 0)
+
+            return chosen
 
+        except OptimizationCancelled:
+            raise
         except Exception as e:
             self.logger.error(f"Error optimizing animated GIF: {str(e)}")
-            return False
+            self._result.error = str(e)
+            return None
 
     def process_folder(self) -> Dict[str, Any]:
         """
@@ -260,62 +888,289 @@ class GifOptimizer:
         self.logger.info(f"Target size: {self.target_size_kb} KB")
         self.logger.info(f"Output folder: {self.output_folder}")
 
-        gif_files = self._get_gif_files()
+        self.results.start()
+        self._progress = ProgressTracker(self._emit_progress)
+
+        # Files are processed while the walk runs ahead in the background,
+        # adding them to the progress total as it finds them
+        gif_files = self._discover_files()
+        if self.incremental:
+            gif_files = self._filter_unchanged(gif_files)
+        walk = WalkAhead(self._track_progress(gif_files))
+        gif_files = walk
 
-        if not gif_files:
+        # Peek far enough to pick sequential or parallel processing
+        head = list(islice(gif_files, self.max_workers))
+        if not head and not self.incremental:
             self.logger.warning("No GIF files found in input folder")
             return self.stats
 
-        self.logger.info(f"Found {len(gif_files)} GIF files to process")
+        workers = len(head)
+        gif_files = chain(head, gif_files)
+        if workers > 1:
+            # Probes of unchanged files are reused from earlier runs
+            self._probes = ProbeIndex(self.output_folder).load()
+            self._process_parallel(gif_files, workers)
+            self._save_probes()
+        else:
+            self._process_sequential(gif_files)
 
-        # Process files with progress updates
-        for idx, gif_file in enumerate(gif_files):
-            self.stats["processed"] += 1
+        cancelled = bool(self.cancel_token and self.cancel_token.cancelled)
+        if cancelled:
+            # Files the walk found after the cancel were never started
+            self.results.count("cancelled", walk.drain())
+            self.logger.warning("Optimization cancelled, statistics are partial")
 
-            # Update progress
-            progress = int((idx + 1) / len(gif_files) * 100)
-            self._update_progress(progress)
+        if self._manifest:
+            # Only a complete walk tells which sources were deleted
+            if self._walk_complete:
+                self._prune_manifest()
+            self._manifest.save()
 
-            # Process the file
-            self._optimize_single_gif(gif_file)
+        self.results.close()
+        if self.report_path:
+            self.logger.info(f"Report written to {self.report_path}")
+        if self.trace_path:
+            write_chrome_trace(Path(self.trace_path), self.results.trace_events)
+            self.logger.info(f"Trace written to {self.trace_path}")
 
-        # Final progress update
-        self._update_progress(100)
+        # Final progress update; a cancelled batch stays where it stopped
+        if not cancelled:
+            self._update_progress(100)
 
         # Log final statistics
         self._log_final_stats()
 
         return self.stats
 
+    def _filter_unchanged(self, gif_files: Iterator[Path]) -> Iterator[Path]:
+        """
+        Apply the processing manifest for incremental runs
+
+        Inputs that are unchanged since the last run with the same settings
+        are skipped; the keys of all inputs are remembered for pruning.
+        """
+        self._manifest = ProcessingManifest(self.output_folder).load()
+        self._config_hash = hash_settings(self._cache_settings())
+        self._present_keys = set()
+        # Files recorded in this run, which paces the periodic saves
+        self._recorded = 0
+
+        skipped = 0
+        for gif_file in gif_files:
+            key = self._manifest_key(gif_file)
+            self._present_keys.add(key)
+            if self._manifest.is_current(key, gif_file, self._config_hash):
+                skipped += 1
+                self.results.count("skipped")
+            else:
+                yield gif_file
+        self.logger.info(f"Skipped {skipped} unchanged files")
+
+    def _save_probes(self):
+        """Persist the probe index, logging how much of it was reused"""
+        self._probes.save()
+        self.logger.info(
+            f"Probed {self._probes.misses} files "
+            f"({self._probes.hits} unchanged since the last run)"
+        )
+
+    def _prune_manifest(self):
+        """Delete the outputs of inputs that disappeared since the last run"""
+        removed = self._manifest.prune(self._present_keys)
+        for key in removed:
+            self.logger.info(f"Removed output of deleted source: {key}")
+        self.results.count("removed", len(removed))
+
+    def _file_completed(self, gif_file: Path, result: FileResult):
+        """Bookkeeping once a file has been processed"""
+        self.results.add(result)
+        if self._manifest and result.success:
+            self._manifest.record(
+                self._manifest_key(gif_file),
+                gif_file,
+                self._config_hash,
+                Path(result.output) if result.output else self._output_path(gif_file),
+                result.output_size,
+            )
+
+            # Persist progress regularly so an interrupted run is not redone
+            self._recorded += 1
+            if self._recorded % MANIFEST_SAVE_INTERVAL == 0:
+                self._manifest.save()
+
+    def _process_sequential(self, gif_files: Iterator[Path]):
+        """Process files one at a time in the calling process"""
+        for gif_file in gif_files:
+            size = self._file_size(gif_file)
+            self._progress.start_file(size)
+
+            # Process the file
+            try:
+                self._check_cancel()
+                result = self._process_file(gif_file)
+            except OptimizationCancelled:
+                self.results.count("cancelled")
+                return
+            self._file_completed(gif_file, result)
+            self._progress.file_done(size)
+
+    def _process_parallel(self, gif_files: Iterator[Path], workers: int):
+        """
+        Fan files out to a process pool
+
+        Only a few files per worker are submitted at a time and more are
+        pulled from the discovery walk as they complete, so work starts
+        before the walk finishes and the pool never queues the whole tree.
+        A file is only admitted while the estimated decoded memory of the
+        files in flight stays within the memory budget; a file larger than
+        the whole budget runs on its own.
+
+        Workers return one FileResult per file; results and progress are
+        collected in this process as files complete, so progress_callback is
+        never invoked from a worker. Progress therefore advances per
+        completed file (weighted by its size) rather than per frame.
+        """
+        self.logger.info(f"Using {workers} worker processes")
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(self._worker_args(),),
+        ) as executor:
+            # future -> (file, estimated decoded bytes)
+            pending: Dict[Future, Tuple[Path, int]] = {}
+            waiting: Optional[Tuple[Path, int]] = None
+            in_flight = 0
+            cancelled = False
+
+            def submit():
+                nonlocal waiting, in_flight
+                while len(pending) < workers * PENDING_PER_WORKER:
+                    if waiting is None:
+                        gif_file = next(gif_files, None)
+                        if gif_file is None:
+                            return
+                        waiting = (gif_file, self._memory_estimate(gif_file))
+                    if pending and in_flight + waiting[1] > self.memory_budget:
+                        return
+                    future = executor.submit(_optimize_in_worker, waiting[0])
+                    pending[future] = waiting
+                    in_flight += waiting[1]
+                    waiting = None
+
+            submit()
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    gif_file, memory = pending.pop(future)
+                    in_flight -= memory
+
+                    try:
+                        result = future.result()
+                    except (OptimizationCancelled, CancelledError):
+                        # Drop files that have not started yet
+                        for queued in pending:
+                            queued.cancel()
+                        self.results.count("cancelled")
+                        cancelled = True
+                        continue
+                    except Exception as e:
+                        self.logger.error(
+                            f"Worker failed on {gif_file.name}: {str(e)}"
+                        )
+                        result = FileResult(str(gif_file))
+                        result.error = str(e)
+
+                    self._file_completed(gif_file, result)
+                    self._progress.file_done(self._file_size(gif_file))
+
+                if not cancelled:
+                    submit()
+
+            if waiting is not None:
+                # Pulled from the walk but never submitted
+                self.results.count("cancelled")
+
     def _log_final_stats(self):
         """Log final processing statistics"""
-        total_savings = (
-            self.stats["total_original_size"] - self.stats["total_optimized_size"]
-        )
+        stats = self.stats
+        total_savings = stats["total_original_size"] - stats["total_optimized_size"]
         savings_percentage = (
-            (total_savings / self.stats["total_original_size"] * 100)
-            if self.stats["total_original_size"] > 0
+            (total_savings / stats["total_original_size"] * 100)
+            if stats["total_original_size"] > 0
             else 0
         )
 
         self.logger.info("=" * 50)
         self.logger.info("OPTIMIZATION COMPLETED")
         self.logger.info("=" * 50)
-        self.logger.info(f"Files processed: {self.stats['processed']}")
-        self.logger.info(f"Successful: {self.stats['successful']}")
-        self.logger.info(f"Failed: {self.stats['failed']}")
+        self.logger.info(f"Files processed: {stats['processed']}")
+        self.logger.info(f"Successful: {stats['successful']}")
+        self.logger.info(f"Failed: {stats['failed']}")
+        if stats["cancelled"]:
+            self.logger.info(f"Cancelled (not processed): {stats['cancelled']}")
+        if self.incremental:
+            self.logger.info(f"Skipped (unchanged): {stats['skipped']}")
+            self.logger.info(f"Removed (source deleted): {stats['removed']}")
         self.logger.info(
-            f"Original total size: {self.stats['total_original_size']:.1f} KB"
+            f"Original total size: {stats['total_original_size']:.1f} KB"
         )
         self.logger.info(
-            f"Optimized total size: {self.stats['total_optimized_size']:.1f} KB"
+            f"Optimized total size: {stats['total_optimized_size']:.1f} KB"
         )
         self.logger.info(
             f"Total savings: {total_savings:.1f} KB ({savings_percentage:.1f}%)"
         )
+        self.logger.info(f"Duplicate frames dropped: {stats['frames_dropped']}")
+        self.logger.info(f"Kept unchanged: {stats['passthrough']}")
+        if stats["ssim_mean"] is not None:
+            self.logger.info(
+                f"Quality: SSIM mean {stats['ssim_mean']:.4f} "
+                f"(min {stats['ssim_min']:.4f}), "
+                f"PSNR mean {stats['psnr_mean']:.1f} dB"
+            )
+        if self.cache:
+            self.logger.info(
+                f"Cache: {stats['cache_hits']} hits, "
+                f"{stats['cache_misses']} misses"
+            )
+        self.logger.info(
+            f"Size search: {stats['search_iterations']} encodes "
+            f"in {stats['search_time']:.1f} s"
+        )
+        self.logger.info(
+            f"Throughput: {stats['files_per_sec']:.2f} files/s, "
+            f"latency p50 {stats['latency_p50']:.2f} s, "
+            f"p99 {stats['latency_p99']:.2f} s"
+        )
+        stage_times = sorted(
+            (item for item in stats["stage_times"].items() if item[0] != "file"),
+            key=lambda item: item[1],
+            reverse=True,
+        )
+        for stage, seconds in stage_times:
+            mean_ms = stats["stage_means"].get(stage, 0.0) * 1000
+            self.logger.info(f"  {stage:<10} {seconds:8.2f} s {mean_ms:9.2f} ms/call")
         self.logger.info("=" * 50)
 
 
+# Process pool workers
+_worker_optimizer: Optional[GifOptimizer] = None
+
+
+def _init_worker(optimizer_args: Dict[str, Any]):
+    """Build one optimizer per worker process"""
+    global _worker_optimizer
+    _worker_optimizer = GifOptimizer(**optimizer_args)
+
+
+def _optimize_in_worker(input_path: Path) -> FileResult:
+    """Optimize one file in a worker, returning its result record"""
+    _worker_optimizer._check_cancel()
+    return _worker_optimizer._process_file(input_path)
+
+
 # Backward compatibility functions
 def compress_gif(input_path, output_path, optimize=True, colors=256):
     """Legacy function for backward compatibility"""
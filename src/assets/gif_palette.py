@@ -0,0 +1,239 @@
+from typing import Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from src.assets.gif_dither import (
+    dither_amplitude,
+    floyd_steinberg,
+    ordered_dither,
+)
+
+# Upper bound on pixels fed to the palette builder
+MAX_SAMPLES = 200_000
+
+# Frames sampled for the global palette (frames are strided to stay under this)
+MAX_SAMPLED_FRAMES = 32
+
+# Cached RGB -> index entries before the cache is reset
+MAX_CACHE_ENTRIES = 1 << 20
+
+# Colors matched against the palette per chunk when filling the cache
+LOOKUP_CHUNK = 4096
+
+
+def sample_pixels(img: Image.Image, max_samples: int = MAX_SAMPLES) -> np.ndarray:
+    """
+    Sample opaque RGB pixels across the frames of an image
+
+    Every frame is visited (GIF frames can only be decoded in order) but only
+    a stride of them is converted and sampled, so the cost is close to a plain
+    decode pass.
+
+    Returns:
+        (N, 3) uint8 array of sampled colors
+    """
+    n_frames = getattr(img, "n_frames", 1)
+    stride = max(1, n_frames // MAX_SAMPLED_FRAMES)
+    sampled_frames = (n_frames + stride - 1) // stride
+    per_frame = max(1, max_samples // sampled_frames)
+
+    samples = []
+    for frame_idx in range(0, n_frames, stride):
+        img.seek(frame_idx)
+        pixels = np.asarray(img.convert("RGBA")).reshape(-1, 4)
+        pixels = pixels[pixels[:, 3] >= 128, :3]
+
+        step = max(1, len(pixels) // per_frame)
+        samples.append(pixels[::step])
+
+    img.seek(0)
+    if not samples:
+        return np.zeros((0, 3), dtype=np.uint8)
+    return np.concatenate(samples)
+
+
+def median_cut(samples: np.ndarray, colors: int) -> np.ndarray:
+    """
+    Build a palette by median cut
+
+    The box with the largest (channel range x population) is split at the
+    median of its widest channel until there are `colors` boxes; each palette
+    entry is the mean of its box.
+
+    Returns:
+        (colors, 3) uint8 palette (fewer entries if samples run out)
+    """
+    if len(samples) == 0:
+        return np.zeros((1, 3), dtype=np.uint8)
+
+    def score(box: np.ndarray) -> int:
+        if len(box) < 2:
+            return -1
+        return int(np.ptp(box, axis=0).max()) * len(box)
+
+    boxes = [samples]
+    scores = [score(samples)]
+    while len(boxes) < colors:
+        idx = int(np.argmax(scores))
+        if scores[idx] <= 0:
+            break
+
+        box = boxes.pop(idx)
+        scores.pop(idx)
+        channel = int(np.argmax(np.ptp(box, axis=0)))
+        box = box[np.argsort(box[:, channel], kind="stable")]
+        middle = len(box) // 2
+        for half in (box[:middle], box[middle:]):
+            boxes.append(half)
+            scores.append(score(half))
+
+    return np.array([box.mean(axis=0) for box in boxes]).round().astype(np.uint8)
+
+
+def nearest_indices(
+    colors: np.ndarray, palette: np.ndarray, norms: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Index of the nearest palette entry for each color
+
+    |c - p|^2 = |c|^2 - 2 c.p + |p|^2, and |c|^2 is the same for every entry,
+    so the search is one matrix product per chunk. Values are integers well
+    below 2^24, so float32 keeps the distances exact.
+
+    Args:
+        colors: (N, 3) float32 colors
+        palette: (P, 3) float32 palette
+        norms: Precomputed squared norms of the palette entries
+
+    Returns:
+        (N,) uint8 indices
+    """
+    if norms is None:
+        norms = (palette**2).sum(axis=1)
+    result = np.empty(len(colors), dtype=np.uint8)
+    for start in range(0, len(colors), LOOKUP_CHUNK):
+        chunk = colors[start : start + LOOKUP_CHUNK]
+        distances = norms[None, :] - 2 * (chunk @ palette.T)
+        result[start : start + LOOKUP_CHUNK] = distances.argmin(axis=1)
+    return result
+
+
+class PaletteMapper:
+    """
+    Maps RGB pixels onto a fixed palette
+
+    Nearest colors are computed with one matrix product per chunk and cached
+    per unique RGB value, so colors repeated across frames are only matched
+    once. The index after the last palette entry is reserved for transparency.
+    """
+
+    def __init__(self, palette: np.ndarray):
+        """
+        Args:
+            palette: (N, 3) uint8 palette with N < 256
+        """
+        self.palette = palette.astype(np.uint8)
+        self.transparency = len(palette)
+        self._palette_float = palette.astype(np.float32)
+        self._palette_norms = (self._palette_float**2).sum(axis=1)
+        self._keys = np.zeros(0, dtype=np.int32)
+        self._values = np.zeros(0, dtype=np.uint8)
+
+    def palette_bytes(self) -> list:
+        """Flat palette including the transparent slot (if room), for putpalette"""
+        flat = self.palette.reshape(-1).tolist()
+        if len(self.palette) < 256:
+            flat += [0, 0, 0]
+        return flat
+
+    def map(self, rgb: np.ndarray) -> np.ndarray:
+        """Map an (H, W, 3) array to an (H, W) array of palette indices"""
+        packed = (
+            (rgb[..., 0].astype(np.int32) << 16)
+            | (rgb[..., 1].astype(np.int32) << 8)
+            | rgb[..., 2].astype(np.int32)
+        )
+        unique, inverse = np.unique(packed, return_inverse=True)
+
+        positions = np.searchsorted(self._keys, unique)
+        clipped = np.minimum(positions, max(0, len(self._keys) - 1))
+        if len(self._keys):
+            known = self._keys[clipped] == unique
+        else:
+            known = np.zeros(len(unique), dtype=bool)
+
+        values = np.empty(len(unique), dtype=np.uint8)
+        values[known] = self._values[clipped[known]]
+
+        missing = unique[~known]
+        if missing.size:
+            found = self._nearest(missing)
+            values[~known] = found
+            self._remember(missing, found)
+
+        return values[inverse].reshape(rgb.shape[:2])
+
+    def quantize(
+        self,
+        frame: Image.Image,
+        dither: str = "none",
+        strength: float = 1.0,
+        origin: Tuple[int, int] = (0, 0),
+    ) -> Tuple[Image.Image, Optional[int]]:
+        """
+        Convert an RGBA frame to palette mode using the shared palette
+
+        Args:
+            frame: Frame to convert
+            dither: "none", "ordered" or "floyd-steinberg"
+            strength: Dither strength (0-1)
+            origin: Position of frame on the canvas, anchoring ordered dither
+
+        Returns:
+            (palette image, transparency index or None)
+        """
+        pixels = np.asarray(frame.convert("RGBA"))
+        rgb = pixels[..., :3]
+        mask = pixels[..., 3] < 128
+
+        if dither == "ordered":
+            amplitude = dither_amplitude(len(self.palette), strength)
+            indices = self.map(ordered_dither(rgb, amplitude, origin))
+        elif dither == "floyd-steinberg":
+            indices = floyd_steinberg(
+                rgb, self._nearest_colors, self.palette, strength, mask
+            )
+        else:
+            indices = self.map(rgb)
+
+        transparency = None
+        if mask.any():
+            indices[mask] = self.transparency
+            transparency = self.transparency
+
+        result = Image.fromarray(indices)
+        result.putpalette(self.palette_bytes())
+        return result, transparency
+
+    def _nearest(self, packed: np.ndarray) -> np.ndarray:
+        """Nearest palette index for each packed RGB value"""
+        colors = np.stack(
+            [(packed >> 16) & 0xFF, (packed >> 8) & 0xFF, packed & 0xFF], axis=1
+        ).astype(np.float32)
+        return self._nearest_colors(colors)
+
+    def _nearest_colors(self, colors: np.ndarray) -> np.ndarray:
+        """Nearest palette index for each (N, 3) float32 color, uncached"""
+        return nearest_indices(colors, self._palette_float, self._palette_norms)
+
+    def _remember(self, keys: np.ndarray, values: np.ndarray):
+        """Merge newly matched colors into the sorted cache"""
+        if len(self._keys) + len(keys) > MAX_CACHE_ENTRIES:
+            self._keys = np.zeros(0, dtype=np.int32)
+            self._values = np.zeros(0, dtype=np.uint8)
+
+        all_keys = np.concatenate([self._keys, keys])
+        order = np.argsort(all_keys, kind="stable")
+        self._keys = all_keys[order]
+        self._values = np.concatenate([self._values, values])[order]
@@ -0,0 +1,236 @@
+import json
+import mmap
+import os
+import struct
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Optional, Set
+
+from src.assets.gif_io import atomic_write
+
+PROBE_INDEX_NAME = ".gif_optimizer_probes.json"
+PROBE_INDEX_VERSION = 1
+
+GIF_SIGNATURES = (b"GIF87a", b"GIF89a")
+
+# Block introducers and extension labels
+IMAGE_DESCRIPTOR = 0x2C
+EXTENSION = 0x21
+TRAILER = 0x3B
+GRAPHIC_CONTROL = 0xF9
+APPLICATION = 0xFF
+
+LOOP_APPLICATIONS = (b"NETSCAPE2.0", b"ANIMEXTS1.0")
+
+# Full (255-byte) sub-blocks checked per step when skipping image data
+SKIP_RUN = 64
+
+
+@dataclass
+class GifProbe:
+    """Metadata of a GIF, read from its block structure without decoding"""
+
+    width: int
+    height: int
+    frames: int
+    duration: int  # Total frame delay in ms
+    loop: Optional[int]  # NETSCAPE loop count (None = no loop block)
+    global_colors: int  # Global color table entries (0 = none)
+    local_palettes: int  # Frames with their own color table
+    max_local_colors: int  # Largest local color table (0 = none)
+
+    @property
+    def colors(self) -> int:
+        """Largest color table any frame is drawn with"""
+        return max(self.global_colors, self.max_local_colors)
+
+
+def _skip_sub_blocks(data: bytes, pos: int) -> int:
+    """Position after the data sub-block chain starting at pos"""
+    while True:
+        # Encoders fill sub-blocks to the 255-byte maximum, so the length
+        # bytes of a run of full blocks sit 256 bytes apart: take up to
+        # SKIP_RUN of them with one strided slice and jump over the full ones
+        lengths = data[pos : pos + 256 * SKIP_RUN : 256]
+        full = len(lengths) - len(lengths.lstrip(b"\xff"))
+        pos += 256 * full
+        if full == len(lengths) and full:
+            continue
+        size = data[pos]
+        pos += size + 1
+        if not size:
+            return pos
+
+
+def parse_gif(data: bytes) -> GifProbe:
+    """
+    Read GIF metadata by walking its blocks
+
+    Only the block headers are looked at: color tables are skipped by their
+    size and image data by following the sub-block length bytes, so nothing
+    is decompressed.
+
+    Args:
+        data: GIF file contents (bytes or an mmap)
+
+    Raises:
+        ValueError: data is not a GIF, is truncated or has no frame
+    """
+    if len(data) < 13 or data[:6] not in GIF_SIGNATURES:
+        raise ValueError("Not a GIF file")
+
+    width, height, flags = struct.unpack_from("<HHB", data, 6)
+    global_colors = 2 << (flags & 0x07) if flags & 0x80 else 0
+    pos = 13 + 3 * global_colors
+
+    frames = duration = delay = 0
+    local_palettes = max_local_colors = 0
+    loop = None
+    try:
+        while True:
+            block = data[pos]
+            if block == EXTENSION:
+                label = data[pos + 1]
+                pos += 2
+                if label == GRAPHIC_CONTROL and data[pos] >= 4:
+                    delay = struct.unpack_from("<H", data, pos + 2)[0]
+                elif (
+                    label == APPLICATION
+                    and data[pos] == 11
+                    and data[pos + 1 : pos + 12] in LOOP_APPLICATIONS
+                    and data[pos + 12] >= 3
+                    and data[pos + 13] == 1
+                ):
+                    loop = struct.unpack_from("<H", data, pos + 14)[0]
+                pos = _skip_sub_blocks(data, pos)
+            elif block == IMAGE_DESCRIPTOR:
+                flags = data[pos + 9]
+                pos += 10
+                if flags & 0x80:
+                    local_colors = 2 << (flags & 0x07)
+                    local_palettes += 1
+                    max_local_colors = max(max_local_colors, local_colors)
+                    pos += 3 * local_colors
+                # LZW minimum code size, then the image data
+                pos = _skip_sub_blocks(data, pos + 1)
+                frames += 1
+                # The graphic control extension applies to the next image only
+                duration += delay * 10
+                delay = 0
+            elif block == TRAILER:
+                break
+            else:
+                raise ValueError(f"Unknown GIF block 0x{block:02x} at {pos}")
+    except (IndexError, struct.error):
+        # Ended before the trailer: the frame counts and durations would be
+        # short, and decoding would fail or stop at the cut anyway
+        raise ValueError("Truncated GIF") from None
+
+    if not frames:
+        raise ValueError("GIF has no frame")
+    return GifProbe(
+        width=width,
+        height=height,
+        frames=frames,
+        duration=duration,
+        loop=loop,
+        global_colors=global_colors,
+        local_palettes=local_palettes,
+        max_local_colors=max_local_colors,
+    )
+
+
+def probe_gif(path: Path) -> Optional[GifProbe]:
+    """GIF metadata of path, or None if it cannot be read or is not a GIF"""
+    try:
+        # Mapped rather than read: only the pages holding block headers and
+        # sub-block lengths are touched, nothing is copied
+        with open(path, "rb") as fp, mmap.mmap(
+            fp.fileno(), 0, access=mmap.ACCESS_READ
+        ) as data:
+            return parse_gif(data)
+    except (OSError, ValueError):
+        return None
+
+
+@dataclass
+class ProbeEntry:
+    """Probe result of one file, valid while its size and mtime match"""
+
+    size: int
+    mtime_ns: int
+    probe: Optional[GifProbe]
+
+
+class ProbeIndex:
+    """
+    Persistent probe results, kept in the output folder
+
+    Entries are keyed by file path and reused while the file's size and
+    mtime are unchanged, so rescanning a large folder costs one stat per
+    file. Files that are not GIFs are remembered as such.
+    """
+
+    def __init__(self, folder: Path):
+        self.path = Path(folder) / PROBE_INDEX_NAME
+        self.entries: Dict[str, ProbeEntry] = {}
+        self.hits = 0
+        self.misses = 0
+        self._seen: Set[str] = set()
+
+    def load(self) -> "ProbeIndex":
+        """Read the index from disk; a missing or unreadable one starts empty"""
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            if data.get("version") == PROBE_INDEX_VERSION:
+                self.entries = {
+                    key: ProbeEntry(
+                        size=entry["size"],
+                        mtime_ns=entry["mtime_ns"],
+                        probe=GifProbe(**entry["probe"]) if entry["probe"] else None,
+                    )
+                    for key, entry in data.get("files", {}).items()
+                }
+        except (OSError, ValueError, TypeError, KeyError):
+            self.entries = {}
+        return self
+
+    def save(self):
+        """
+        Write the index atomically if files were probed since loading
+
+        Entries not looked up since loading are dropped when their file no
+        longer exists.
+        """
+        if not self.misses:
+            return
+        for key in [key for key in self.entries if key not in self._seen]:
+            if not os.path.exists(key):
+                del self.entries[key]
+        data = {
+            "version": PROBE_INDEX_VERSION,
+            "files": {key: asdict(entry) for key, entry in self.entries.items()},
+        }
+        atomic_write(self.path, json.dumps(data, separators=(",", ":")).encode())
+
+    def get(self, path: Path) -> Optional[GifProbe]:
+        """Probe of path, from the index if the file is unchanged"""
+        key = str(path)
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        self._seen.add(key)
+        entry = self.entries.get(key)
+        if (
+            entry is not None
+            and entry.size == stat.st_size
+            and entry.mtime_ns == stat.st_mtime_ns
+        ):
+            self.hits += 1
+            return entry.probe
+
+        self.misses += 1
+        probe = probe_gif(path)
+        self.entries[key] = ProbeEntry(stat.st_size, stat.st_mtime_ns, probe)
+        return probe
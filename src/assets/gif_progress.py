@@ -0,0 +1,142 @@
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Optional, Tuple
+
+# Seconds of history used for the current throughput
+RATE_WINDOW = 10.0
+
+
+@dataclass
+class BatchProgress:
+    """Snapshot of a running batch"""
+
+    percent: int
+    files_done: int
+    files_total: int
+    bytes_done: int
+    bytes_total: int
+    bytes_per_sec: float
+    eta: Optional[float]  # Seconds remaining, None until a rate is known
+
+
+class ProgressTracker:
+    """
+    Byte-weighted batch progress with rate-limited reporting
+
+    Each file weighs its input size. Completed files count fully; the file in
+    progress counts by the fraction reported through update_file(), so a
+    large animation advances frame by frame instead of jumping at the end.
+    Reports reach the callback at most max_rate times per second (the final
+    report always gets through), so thousands of tiny files do not flood a
+    GUI event loop. Safe to call from several threads.
+    """
+
+    def __init__(
+        self,
+        callback: Callable[[BatchProgress], None],
+        files_total: int = 0,
+        bytes_total: int = 0,
+        max_rate: float = 20.0,
+    ):
+        self.callback = callback
+        self.files_total = files_total
+        self.bytes_total = bytes_total
+        self.min_interval = 1.0 / max_rate if max_rate > 0 else 0.0
+        self._lock = threading.Lock()
+
+        self.files_done = 0
+        self.bytes_done = 0
+        self._current_bytes = 0
+        self._current_fraction = 0.0
+        self._last_emit = float("-inf")
+        self._samples: Deque[Tuple[float, float]] = deque()
+
+    def add_total(self, files: int, nbytes: int):
+        """
+        Grow the batch as more files are discovered
+
+        Not reported by itself (discovery may run in another thread); the
+        new totals go out with the next update.
+        """
+        with self._lock:
+            self.files_total += files
+            self.bytes_total += nbytes
+
+    def start_file(self, nbytes: int):
+        """A file of nbytes is being processed in this process"""
+        with self._lock:
+            self._current_bytes = nbytes
+            self._current_fraction = 0.0
+
+    def update_file(self, fraction: float):
+        """Fraction (0-1) of the current file done; progress never moves back"""
+        with self._lock:
+            if fraction <= self._current_fraction:
+                return
+            self._current_fraction = min(1.0, fraction)
+        self._report()
+
+    def file_done(self, nbytes: int):
+        """A file of nbytes finished (successfully or not)"""
+        with self._lock:
+            self.files_done += 1
+            self.bytes_done += nbytes
+            self._current_bytes = 0
+            self._current_fraction = 0.0
+        self._report(force=self.files_done >= self.files_total)
+
+    def snapshot(self) -> BatchProgress:
+        with self._lock:
+            return self._snapshot(time.monotonic())
+
+    def _snapshot(self, now: float) -> BatchProgress:
+        """Progress at now (caller holds the lock)"""
+        done = self.bytes_done + self._current_bytes * self._current_fraction
+        samples = self._samples
+        samples.append((now, done))
+        while len(samples) > 2 and now - samples[0][0] > RATE_WINDOW:
+            samples.popleft()
+
+        elapsed = now - samples[0][0]
+        rate = (done - samples[0][1]) / elapsed if elapsed > 0 else 0.0
+        remaining = max(0, self.bytes_total - done)
+
+        if self.bytes_total:
+            percent = int(done / self.bytes_total * 100)
+        elif self.files_total:
+            percent = int(self.files_done / self.files_total * 100)
+        else:
+            percent = 0
+
+        return BatchProgress(
+            percent=min(100, percent),
+            files_done=self.files_done,
+            files_total=self.files_total,
+            bytes_done=int(done),
+            bytes_total=self.bytes_total,
+            bytes_per_sec=rate,
+            eta=remaining / rate if rate > 0 else None,
+        )
+
+    def _report(self, force: bool = False):
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._last_emit < self.min_interval:
+                return
+            self._last_emit = now
+            progress = self._snapshot(now)
+        self.callback(progress)
+
+
+def format_progress(progress: BatchProgress) -> str:
+    """One-line human readable status, e.g. for a status bar"""
+    text = (
+        f"{progress.files_done}/{progress.files_total} files, "
+        f"{progress.bytes_per_sec / (1024 * 1024):.1f} MB/s"
+    )
+    if progress.eta is not None and progress.files_done < progress.files_total:
+        minutes, seconds = divmod(int(progress.eta), 60)
+        text += f", {minutes}:{seconds:02d} left"
+    return text
@@ -0,0 +1,169 @@
+import io
+import math
+from typing import List, Tuple
+
+import numpy as np
+from PIL import Image
+
+# Longest side of the common size both images are compared at
+METRIC_SIZE = 256
+
+# Frames compared per animation, spread evenly over its duration
+METRIC_FRAMES = 8
+
+# SSIM window (uniform, as in Wang et al.'s fast variant) and constants
+SSIM_WINDOW = 7
+SSIM_C1 = (0.01 * 255) ** 2
+SSIM_C2 = (0.03 * 255) ** 2
+
+# Reported for identical images instead of infinity
+MAX_PSNR = 100.0
+
+# Transparent pixels are compared as if shown on this gray
+BACKGROUND = (128, 128, 128, 255)
+
+
+def psnr(reference: np.ndarray, candidate: np.ndarray) -> float:
+    """Peak signal-to-noise ratio in dB of two uint8 arrays"""
+    mse = np.mean((reference.astype(np.float64) - candidate) ** 2)
+    if mse == 0:
+        return MAX_PSNR
+    return min(MAX_PSNR, 10 * math.log10(255.0**2 / mse))
+
+
+def _box_mean(values: np.ndarray, size: int) -> np.ndarray:
+    """Mean over every size x size window (valid region), via an integral image"""
+    integral = np.pad(values.cumsum(axis=0).cumsum(axis=1), ((1, 0), (1, 0)))
+    window = (
+        integral[size:, size:]
+        - integral[:-size, size:]
+        - integral[size:, :-size]
+        + integral[:-size, :-size]
+    )
+    return window / (size * size)
+
+
+def ssim(reference: np.ndarray, candidate: np.ndarray) -> float:
+    """
+    Mean structural similarity of two grayscale arrays
+
+    Local means, variances and covariance come from box filters over
+    SSIM_WINDOW x SSIM_WINDOW windows, each computed with one integral image.
+    """
+    x = reference.astype(np.float64)
+    y = candidate.astype(np.float64)
+    size = min(SSIM_WINDOW, *x.shape)
+
+    mu_x = _box_mean(x, size)
+    mu_y = _box_mean(y, size)
+    var_x = _box_mean(x * x, size) - mu_x**2
+    var_y = _box_mean(y * y, size) - mu_y**2
+    covariance = _box_mean(x * y, size) - mu_x * mu_y
+
+    numerator = (2 * mu_x * mu_y + SSIM_C1) * (2 * covariance + SSIM_C2)
+    denominator = (mu_x**2 + mu_y**2 + SSIM_C1) * (var_x + var_y + SSIM_C2)
+    return float(np.mean(numerator / denominator))
+
+
+def metric_size(size: Tuple[int, int], limit: int = METRIC_SIZE) -> Tuple[int, int]:
+    """Common comparison size: size fitted into a limit x limit box"""
+    fit = min(1.0, limit / max(size))
+    return max(1, round(size[0] * fit)), max(1, round(size[1] * fit))
+
+
+def _duration(img: Image.Image) -> int:
+    """Display time of the current frame, defaulting like decode_frames()"""
+    return img.info.get("duration", 100) or 0
+
+
+def _frame_times(img: Image.Image, count: int) -> List[int]:
+    """Timestamps (ms) in the middle of count evenly spaced frames of img"""
+    n_frames = getattr(img, "n_frames", 1)
+    if n_frames == 1:
+        return [0]
+    wanted = set(np.linspace(0, n_frames - 1, min(count, n_frames)).round().astype(int))
+
+    times = []
+    start = 0
+    for frame_idx in range(n_frames):
+        img.seek(frame_idx)
+        duration = _duration(img)
+        if frame_idx in wanted:
+            times.append(start + duration // 2)
+        start += duration
+    img.seek(0)
+    return times
+
+
+def _frames_at(
+    img: Image.Image, times: List[int], size: Tuple[int, int]
+) -> List[np.ndarray]:
+    """RGB arrays of the frames shown at each timestamp, resized to size"""
+    frames = []
+    remaining = iter(times)
+    wanted = next(remaining, None)
+    n_frames = getattr(img, "n_frames", 1)
+    start = 0
+    for frame_idx in range(n_frames):
+        if wanted is None:
+            break
+        img.seek(frame_idx)
+        rgba = img.convert("RGBA")
+        # WebP reports the duration once the frame is loaded
+        end = start + _duration(img)
+        while wanted is not None and (wanted < end or frame_idx == n_frames - 1):
+            background = Image.new("RGBA", rgba.size, BACKGROUND)
+            shown = Image.alpha_composite(background, rgba)
+            shown = shown.convert("RGB").resize(size, Image.Resampling.BOX)
+            frames.append(np.asarray(shown))
+            wanted = next(remaining, None)
+        start = end
+    img.seek(0)
+    return frames
+
+
+def _luma(rgb: np.ndarray) -> np.ndarray:
+    return rgb @ np.array([0.299, 0.587, 0.114])
+
+
+class QualityReference:
+    """
+    Sampled frames of a source image, for scoring candidate encodes
+
+    Up to METRIC_FRAMES frames are taken at evenly spaced points of the
+    animation and downscaled to a common size once. Candidates are matched
+    by timestamp rather than frame index, so outputs that merged duplicate
+    frames still line up. SSIM is computed on luma, PSNR on RGB, and both
+    are averaged over the sampled frames.
+    """
+
+    def __init__(self, img: Image.Image, frames: int = METRIC_FRAMES):
+        """
+        Args:
+            img: Opened source image (left at frame 0)
+            frames: Number of frames to compare
+        """
+        self.size = metric_size(img.size)
+        self.times = _frame_times(img, frames)
+        self.frames = _frames_at(img, self.times, self.size)
+        self._lumas = [_luma(frame) for frame in self.frames]
+
+    def compare(self, data: bytes) -> Tuple[float, float]:
+        """
+        Score an encoded candidate (GIF, WebP or PNG)
+
+        Returns:
+            (mean SSIM, mean PSNR in dB)
+        """
+        with Image.open(io.BytesIO(data)) as candidate:
+            frames = _frames_at(candidate, self.times, self.size)
+
+        ssims = []
+        psnrs = []
+        for reference, luma, frame in zip(self.frames, self._lumas, frames):
+            ssims.append(ssim(luma, _luma(frame)))
+            psnrs.append(psnr(reference, frame))
+        if not ssims:
+            return 0.0, 0.0
+        return float(np.mean(ssims)), float(np.mean(psnrs))
+
@@ -0,0 +1,259 @@
+import csv
+import json
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import Any, Dict, IO, List, Optional, Sequence
+
+import numpy as np
+
+
+class FileResult:
+    """Outcome of optimizing one file (sizes in bytes, times in seconds)"""
+
+    __slots__ = (
+        "path",
+        "success",
+        "error",
+        "input_size",
+        "output_size",
+        "output",
+        "format",
+        "width",
+        "height",
+        "output_width",
+        "output_height",
+        "frames",
+        "frames_dropped",
+        "iterations",
+        "search_time",
+        "scale",
+        "colors",
+        "fits",
+        "ssim",
+        "psnr",
+        "cached",
+        "passthrough",
+        "seconds",
+        "stage_times",
+        "stage_means",
+        "trace_events",
+    )
+
+    def __init__(self, path: str):
+        self.path = path
+        self.success = False
+        self.error: Optional[str] = None
+        self.input_size = 0
+        self.output_size = 0
+        self.output: Optional[str] = None  # Path of the written output
+        self.format: Optional[str] = None  # Output format (gif, webp, apng)
+        self.width = 0
+        self.height = 0
+        self.output_width = 0
+        self.output_height = 0
+        self.frames = 0
+        self.frames_dropped = 0
+        self.iterations = 0
+        self.search_time = 0.0
+        self.scale = 1.0
+        self.colors = 0
+        self.fits = False
+        self.ssim: Optional[float] = None  # None when quality is not measured
+        self.psnr: Optional[float] = None
+        self.cached: Optional[bool] = None  # None when no cache is configured
+        self.passthrough = False  # Source copied unchanged
+        self.seconds = 0.0
+        self.stage_times: Dict[str, float] = {}
+        # Mean seconds per call of each stage (per frame for frame stages)
+        self.stage_means: Dict[str, float] = {}
+        self.trace_events: List[Dict[str, Any]] = []
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Report row: every field except the trace events"""
+        return {name: getattr(self, name) for name in REPORT_FIELDS}
+
+
+REPORT_FIELDS = [name for name in FileResult.__slots__ if name != "trace_events"]
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Linear-interpolated percentile of values (0 for an empty sequence)"""
+    if not len(values):
+        return 0.0
+    return float(np.percentile(values, pct))
+
+
+class ResultAggregator:
+    """
+    Thread-safe collector of FileResult records
+
+    Each record is folded into running totals and, when a report path is
+    given, appended to a JSONL (or, for a .csv path, CSV) report as it
+    arrives. Only per-file latencies and quality scores are kept, so memory
+    stays flat on large batches. Worker processes return their records to
+    the parent process, which owns the single aggregator.
+    """
+
+    COUNTERS = (
+        "processed",
+        "successful",
+        "failed",
+        "input_bytes",
+        "output_bytes",
+        "search_iterations",
+        "search_time",
+        "frames_dropped",
+        "passthrough",
+        "cache_hits",
+        "cache_misses",
+        "skipped",
+        "removed",
+        "cancelled",
+    )
+
+    def __init__(self, report_path: Optional[str] = None, keep_trace: bool = False):
+        """
+        Args:
+            report_path: Append one row per file to this JSONL/CSV report
+            keep_trace: Keep the trace events of every record
+        """
+        self.report_path = Path(report_path) if report_path else None
+        self.keep_trace = keep_trace
+        self._lock = threading.Lock()
+        self._report: Optional[IO[str]] = None
+        self._csv: Optional[csv.DictWriter] = None
+
+        self.counters: Dict[str, float] = dict.fromkeys(self.COUNTERS, 0)
+        self.stage_times: Dict[str, float] = {}
+        self._stage_calls: Dict[str, float] = {}
+        self.trace_events: List[Dict[str, Any]] = []
+        self._latencies = array("d")
+        self._ssim = array("d")
+        self._psnr = array("d")
+        self._started = time.monotonic()
+
+    def start(self):
+        """Restart the throughput clock at the beginning of a batch"""
+        with self._lock:
+            self._started = time.monotonic()
+
+    def add(self, result: FileResult):
+        """Fold one file's record into the totals and the report"""
+        with self._lock:
+            counters = self.counters
+            counters["processed"] += 1
+            counters["input_bytes"] += result.input_size
+            if result.success:
+                counters["successful"] += 1
+                counters["output_bytes"] += result.output_size
+            else:
+                counters["failed"] += 1
+            counters["search_iterations"] += result.iterations
+            counters["search_time"] += result.search_time
+            counters["frames_dropped"] += result.frames_dropped
+            counters["passthrough"] += result.passthrough
+            if result.cached is not None:
+                counters["cache_hits" if result.cached else "cache_misses"] += 1
+
+            for stage, seconds in result.stage_times.items():
+                self.stage_times[stage] = self.stage_times.get(stage, 0.0) + seconds
+                mean = result.stage_means.get(stage)
+                if mean:
+                    calls = self._stage_calls.get(stage, 0.0) + seconds / mean
+                    self._stage_calls[stage] = calls
+            if self.keep_trace:
+                self.trace_events.extend(result.trace_events)
+            self._latencies.append(result.seconds)
+            if result.ssim is not None:
+                self._ssim.append(result.ssim)
+                self._psnr.append(result.psnr)
+
+            if self.report_path:
+                self._write(result)
+
+    def count(self, counter: str, amount: int = 1):
+        """Add to a counter that is not tied to a processed file"""
+        with self._lock:
+            self.counters[counter] += amount
+
+    def percentile(self, pct: float) -> float:
+        """Percentile of per-file latency in seconds"""
+        with self._lock:
+            latencies = self._latencies.tolist()
+        return percentile(latencies, pct)
+
+    def summary(self) -> Dict[str, Any]:
+        """Totals, throughput, latency percentiles and quality (sizes in KB)"""
+        with self._lock:
+            counters = dict(self.counters)
+            stage_times = dict(self.stage_times)
+            stage_means = {
+                stage: stage_times[stage] / calls
+                for stage, calls in self._stage_calls.items()
+            }
+            latencies = self._latencies.tolist()
+            ssim = self._ssim.tolist()
+            psnr = self._psnr.tolist()
+            elapsed = time.monotonic() - self._started
+
+        summary = {
+            key: value
+            for key, value in counters.items()
+            if key not in ("input_bytes", "output_bytes")
+        }
+        summary.update(
+            {
+                "total_original_size": counters["input_bytes"] / 1024,
+                "total_optimized_size": counters["output_bytes"] / 1024,
+                "stage_times": stage_times,
+                "stage_means": stage_means,
+                "elapsed": elapsed,
+                "files_per_sec": counters["processed"] / elapsed if elapsed else 0.0,
+                "mb_per_sec": (
+                    counters["input_bytes"] / (1024 * 1024) / elapsed
+                    if elapsed
+                    else 0.0
+                ),
+                "latency_p50": percentile(latencies, 50),
+                "latency_p90": percentile(latencies, 90),
+                "latency_p99": percentile(latencies, 99),
+                # None unless quality was measured
+                "ssim_mean": float(np.mean(ssim)) if ssim else None,
+                "ssim_min": min(ssim) if ssim else None,
+                "psnr_mean": float(np.mean(psnr)) if psnr else None,
+            }
+        )
+        return summary
+
+    def close(self):
+        """Flush and close the report; later records reopen it for appending"""
+        with self._lock:
+            if self._report:
+                self._report.close()
+            self._report = None
+            self._csv = None
+
+    def _write(self, result: FileResult):
+        """Append one record to the report (caller holds the lock)"""
+        if self._report is None:
+            self.report_path.parent.mkdir(parents=True, exist_ok=True)
+            # Line buffered, so rows are visible while a long batch runs
+            self._report = open(
+                self.report_path, "a", encoding="utf-8", newline="", buffering=1
+            )
+            if self.report_path.suffix.lower() == ".csv":
+                self._csv = csv.DictWriter(
+                    self._report, fieldnames=REPORT_FIELDS, lineterminator="\n"
+                )
+                if self._report.tell() == 0:
+                    self._csv.writeheader()
+
+        row = result.to_dict()
+        if self._csv:
+            row["stage_times"] = json.dumps(row["stage_times"])
+            row["stage_means"] = json.dumps(row["stage_means"])
+            self._csv.writerow(row)
+        else:
+            self._report.write(json.dumps(row) + "\n")
@@ -0,0 +1,196 @@
+import math
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+# Smallest scale factor the search will try
+MIN_SCALE = 0.1
+
+# Bracket width at which scale bisection stops
+SCALE_RESOLUTION = 0.02
+
+# Smallest palette size the search will fall back to
+MIN_COLORS = 16
+
+
+@dataclass
+class SearchResult:
+    """Accepted candidate of a target-size or quality search"""
+
+    data: bytes
+    scale: float
+    colors: int
+    iterations: int
+    seconds: float
+    fits: bool
+    quality: Optional[float] = None  # Score of the candidate in quality mode
+
+
+def search_encoding(
+    encode: Callable[[float, int], bytes],
+    target_bytes: int,
+    initial_scale: float,
+    colors: int,
+    max_encodes: int = 8,
+    tolerance: float = 0.1,
+) -> Optional[SearchResult]:
+    """
+    Find the largest encoding that fits in target_bytes
+
+    The scale factor is bisected first, starting from initial_scale and
+    refining the guess from the size of each candidate. If nothing fits at
+    the minimum scale, the palette is halved until it does. Every candidate
+    is encoded in memory; the search stops once a candidate lands within
+    tolerance of the target, the scale bracket is narrower than
+    SCALE_RESOLUTION, or max_encodes is used up.
+
+    Args:
+        encode: Callable returning the encoded bytes for (scale, colors)
+        target_bytes: Size budget in bytes
+        initial_scale: First scale factor to try
+        colors: Initial palette size
+        max_encodes: Upper bound on the number of encodes
+        tolerance: Accept a fitting candidate within this fraction of target
+
+    Returns:
+        SearchResult for the largest fitting candidate, or for the smallest
+        candidate if none fits; None if max_encodes is zero
+    """
+    start = time.perf_counter()
+    best_fit = None
+    smallest = None
+    iterations = 0
+
+    # Largest scale known to fit and smallest scale known not to fit
+    low, high = 0.0, 1.0
+    high_fails = False
+    scale = max(MIN_SCALE, min(1.0, initial_scale))
+
+    while iterations < max_encodes:
+        data = encode(scale, colors)
+        iterations += 1
+        size = len(data)
+
+        if smallest is None or size < len(smallest[0]):
+            smallest = (data, scale, colors)
+
+        if size <= target_bytes:
+            if best_fit is None or size > len(best_fit[0]):
+                best_fit = (data, scale, colors)
+            if scale >= 1.0 or size >= target_bytes * (1 - tolerance):
+                break
+            low = scale
+        else:
+            high, high_fails = scale, True
+
+        if best_fit is None and scale <= MIN_SCALE:
+            # Scaling alone cannot reach the target: shrink the palette
+            if colors <= MIN_COLORS:
+                break
+            colors = max(MIN_COLORS, colors // 2)
+            continue
+
+        if high_fails and high - low < SCALE_RESOLUTION:
+            break
+
+        if low > 0.0 and high_fails:
+            scale = (low + high) / 2
+        else:
+            # Not bracketed yet: extrapolate, area scales with the square
+            guess = scale * math.sqrt(target_bytes / size)
+            if size > target_bytes:
+                guess *= 0.95
+            scale = max(MIN_SCALE, min(1.0, guess))
+            if high_fails and scale >= high:
+                scale = max(MIN_SCALE, (low + high) / 2)
+
+    chosen = best_fit or smallest
+    if chosen is None:
+        return None
+
+    data, scale, colors = chosen
+    return SearchResult(
+        data=data,
+        scale=scale,
+        colors=colors,
+        iterations=iterations,
+        seconds=time.perf_counter() - start,
+        fits=best_fit is not None,
+    )
+
+
+def search_quality(
+    encode: Callable[[float, int], bytes],
+    measure: Callable[[bytes], float],
+    min_quality: float,
+    colors: int,
+    max_encodes: int = 8,
+) -> Optional[SearchResult]:
+    """
+    Find the smallest encoding whose quality stays at or above min_quality
+
+    Quality falls as the scale shrinks, so the scale is bisected for the
+    smallest one that still passes, starting from full size. With encodes
+    left over, the palette is then halved at that scale while the quality
+    holds.
+
+    Args:
+        encode: Callable returning the encoded bytes for (scale, colors)
+        measure: Callable scoring encoded bytes (higher is better)
+        min_quality: Quality floor
+        colors: Initial palette size
+        max_encodes: Upper bound on the number of encodes
+
+    Returns:
+        SearchResult for the smallest passing candidate, or for the best
+        scoring candidate if none passes; None if max_encodes is zero
+    """
+    start = time.perf_counter()
+    best_pass = None
+    best_score = None
+    iterations = 0
+
+    def attempt(scale: float, colors: int) -> bool:
+        nonlocal best_pass, best_score, iterations
+        data = encode(scale, colors)
+        quality = measure(data)
+        iterations += 1
+        candidate = (data, scale, colors, quality)
+        if best_score is None or quality > best_score[3]:
+            best_score = candidate
+        if quality < min_quality:
+            return False
+        if best_pass is None or len(data) < len(best_pass[0]):
+            best_pass = candidate
+        return True
+
+    # Scale bracket: high is known to pass, low is not
+    low, high = MIN_SCALE, 1.0
+    if max_encodes > 0 and attempt(1.0, colors):
+        while iterations < max_encodes and high - low >= SCALE_RESOLUTION:
+            scale = (low + high) / 2
+            if attempt(scale, colors):
+                high = scale
+            else:
+                low = scale
+
+        scale = best_pass[1]
+        while iterations < max_encodes and colors > MIN_COLORS:
+            colors = max(MIN_COLORS, colors // 2)
+            if not attempt(scale, colors):
+                break
+
+    chosen = best_pass or best_score
+    if chosen is None:
+        return None
+
+    data, scale, colors, quality = chosen
+    return SearchResult(
+        data=data,
+        scale=scale,
+        colors=colors,
+        iterations=iterations,
+        seconds=time.perf_counter() - start,
+        fits=best_pass is not None,
+        quality=quality,
+    )
@@ -0,0 +1,411 @@
+import hashlib
+from typing import BinaryIO, Iterable, Iterator, Optional, Tuple
+
+import numpy as np
+from PIL import GifImagePlugin, Image
+
+from src.assets.gif_lossy import lossy_image
+from src.assets.gif_palette import PaletteMapper
+from src.assets.gif_trace import NULL_TIMER, StageTimer
+
+# Frames are passed around as (RGBA image, duration in ms) pairs
+Frame = Tuple[Image.Image, int]
+
+# GIF disposal methods
+DISPOSAL_NONE = 1
+DISPOSAL_BACKGROUND = 2
+
+# Integer box reduction is only applied while its result stays at least this
+# many times the final size, so the LANCZOS pass keeps its quality
+REDUCING_GAP = 2.0
+
+# RGBA frames alive at once while streaming: decoded, held by the duplicate
+# filter, pending in the writer and being quantized
+FRAMES_IN_MEMORY = 4
+
+
+def estimate_decoded_bytes(width: int, height: int, frames: int = 1) -> int:
+    """
+    Peak decoded-frame memory of streaming an image through the optimizer
+
+    Frames are streamed, so at most FRAMES_IN_MEMORY RGBA frames are alive
+    at a time, plus the palette-mode frame Pillow keeps while decoding.
+    """
+    return width * height * (1 + 4 * min(frames, FRAMES_IN_MEMORY))
+
+
+def reduce_factor(source: Tuple[int, int], size: Optional[Tuple[int, int]]) -> int:
+    """Integer box-reduction factor to apply before resizing source to size"""
+    if not size:
+        return 1
+    ratio = min(source[0] / size[0], source[1] / size[1])
+    return max(1, int(ratio / REDUCING_GAP))
+
+
+def decode_frames(
+    img: Image.Image, timer: StageTimer = NULL_TIMER, reduce: int = 1
+) -> Iterator[Frame]:
+    """
+    Decode the frames of an animated image one at a time
+
+    Only the frame currently being yielded is held in memory, so callers that
+    consume the iterator incrementally stay bounded regardless of frame count.
+
+    Args:
+        img: Opened (animated) image
+        timer: Receives decode and reduce timings
+        reduce: Shrink each frame by this integer factor right after decoding
+            (a cheap box reduction ahead of the final resize)
+
+    Yields:
+        (frame, duration) pairs with frames in RGBA mode
+    """
+    for frame_idx in range(getattr(img, "n_frames", 1)):
+        with timer.stage("decode", frame=frame_idx):
+            img.seek(frame_idx)
+            frame = img.convert("RGBA")
+        if reduce > 1:
+            with timer.stage("reduce"):
+                frame = frame.reduce(reduce)
+        yield frame, img.info.get("duration", 100)
+
+
+def resize_frames(
+    frames: Iterable[Frame],
+    size: Optional[Tuple[int, int]],
+    timer: StageTimer = NULL_TIMER,
+) -> Iterator[Frame]:
+    """Resize frames to size (None keeps the original dimensions)"""
+    for frame, duration in frames:
+        if size and size != frame.size:
+            with timer.stage("resize"):
+                frame = frame.resize(size, Image.Resampling.LANCZOS)
+        yield frame, duration
+
+
+class DuplicateFrameFilter:
+    """
+    Collapses runs of duplicate frames into a single frame
+
+    A frame is a duplicate when it hashes equal to the last kept frame or,
+    with a tolerance, when no channel differs from it by more than tolerance.
+    The kept frame's duration becomes the sum of the run, so total animation
+    time is preserved. Only the kept frame and the incoming one are held.
+    """
+
+    def __init__(self, tolerance: int = 0, timer: StageTimer = NULL_TIMER):
+        """
+        Args:
+            tolerance: Largest per-channel difference still counted as equal
+            timer: Receives dedupe timings
+        """
+        self.tolerance = tolerance
+        self.timer = timer
+        self.dropped = 0
+
+    def __call__(self, frames: Iterable[Frame]) -> Iterator[Frame]:
+        self.dropped = 0
+        kept = None
+        kept_duration = 0
+        kept_key = None
+
+        for frame, duration in frames:
+            with self.timer.stage("dedupe"):
+                key = self._key(frame)
+                duplicate = kept is not None and self._same(kept_key, key)
+
+            if duplicate:
+                kept_duration += duration
+                self.dropped += 1
+                continue
+
+            if kept is not None:
+                yield kept, kept_duration
+            kept, kept_duration, kept_key = frame, duration, key
+
+        if kept is not None:
+            yield kept, kept_duration
+
+    def _key(self, frame: Image.Image):
+        """Digest for exact matching, pixel array for tolerant matching"""
+        if self.tolerance > 0:
+            return np.asarray(frame, dtype=np.int16)
+        return (frame.size, hashlib.blake2b(frame.tobytes(), digest_size=16).digest())
+
+    def _same(self, kept_key, key) -> bool:
+        if self.tolerance > 0:
+            if kept_key.shape != key.shape:
+                return False
+            return int(np.abs(kept_key - key).max()) <= self.tolerance
+        return kept_key == key
+
+
+def is_opaque(frame: Image.Image) -> bool:
+    """True if an RGBA frame has no transparent pixels"""
+    return frame.getchannel("A").getextrema()[0] == 255
+
+
+def quantize_frame(
+    frame: Image.Image,
+    colors: int,
+    dither: str = "none",
+    strength: float = 1.0,
+    origin: Tuple[int, int] = (0, 0),
+) -> Tuple[Image.Image, Optional[int]]:
+    """
+    Convert an RGBA frame to palette mode
+
+    Pixels with alpha below 128 are mapped to a dedicated transparent palette
+    entry, which costs one of the available colors. With dithering, the
+    adaptive palette is built first and the frame is then mapped onto it
+    through a PaletteMapper.
+
+    Args:
+        frame: Frame to convert
+        colors: Maximum palette size
+        dither: "none", "ordered" or "floyd-steinberg"
+        strength: Dither strength (0-1)
+        origin: Position of frame on the canvas, anchoring ordered dither
+
+    Returns:
+        (palette image, transparency index or None)
+    """
+    alpha = np.asarray(frame.getchannel("A"))
+    mask = alpha < 128
+    rgb = frame.convert("RGB")
+
+    if dither != "none":
+        budget = colors - 1 if mask.any() else colors
+        quantized = rgb.convert("P", palette=Image.Palette.ADAPTIVE, colors=budget)
+        palette = np.array(quantized.getpalette(), dtype=np.uint8).reshape(-1, 3)
+        return PaletteMapper(palette).quantize(frame, dither, strength, origin)
+
+    if not mask.any():
+        return rgb.convert("P", palette=Image.Palette.ADAPTIVE, colors=colors), None
+
+    quantized = rgb.convert("P", palette=Image.Palette.ADAPTIVE, colors=colors - 1)
+    palette = quantized.getpalette()
+    transparency = len(palette) // 3
+
+    indices = np.array(quantized, dtype=np.uint8)
+    indices[mask] = transparency
+
+    result = Image.fromarray(indices)
+    result.putpalette(palette + [0, 0, 0])
+    return result, transparency
+
+
+def changed_region(
+    previous: np.ndarray, current: np.ndarray
+) -> Tuple[Optional[tuple], Optional[np.ndarray]]:
+    """
+    Locate the pixels that differ between two RGBA frames
+
+    Args:
+        previous: Previous frame as an (H, W, 4) array
+        current: Current frame as an (H, W, 4) array
+
+    Returns:
+        (bbox, unchanged) where bbox is the (left, upper, right, lower) box
+        around all changed pixels and unchanged is a boolean mask of the
+        pixels inside it that did not change; (None, None) if the frames
+        are identical
+    """
+    changed = np.any(previous != current, axis=2)
+
+    rows = np.flatnonzero(changed.any(axis=1))
+    if rows.size == 0:
+        return None, None
+    cols = np.flatnonzero(changed.any(axis=0))
+
+    top, bottom = rows[0], rows[-1] + 1
+    left, right = cols[0], cols[-1] + 1
+
+    unchanged = ~changed[top:bottom, left:right]
+    return (int(left), int(top), int(right), int(bottom)), unchanged
+
+
+class GifStreamWriter:
+    """
+    Incremental animated GIF encoder
+
+    Frames are encoded and written as soon as the following frame is known,
+    so at most two decoded frames are alive at any time. Identical
+    consecutive frames are merged by adding their durations.
+
+    With diff_frames enabled each frame is cropped to the box that changed
+    since the previous frame and pixels inside the box that did not change
+    are made transparent, so the encoder only sees the pixels that actually
+    differ and long transparent runs compress well.
+
+    With a shared palette every frame is mapped onto one global color table
+    instead of carrying its own local palette.
+
+    With a lossy tolerance, runs of quantized indices are extended wherever
+    the color error stays within it, which lengthens LZW matches.
+    """
+
+    def __init__(
+        self,
+        fp: BinaryIO,
+        loop: Optional[int] = 0,
+        colors: int = 256,
+        optimize: bool = True,
+        diff_frames: bool = True,
+        palette: Optional[PaletteMapper] = None,
+        lossy: float = 0,
+        dither: str = "none",
+        dither_strength: float = 1.0,
+        timer: StageTimer = NULL_TIMER,
+    ):
+        """
+        Args:
+            fp: Writable binary file object
+            loop: Loop count stored in the NETSCAPE extension (0 = forever,
+                None writes no extension so the animation plays once)
+            colors: Maximum palette size per frame
+            optimize: Trim unused entries from the global color table
+            diff_frames: Encode only the changed region of each frame
+            palette: Shared palette written as the global color table
+            lossy: Largest RGB error traded for compression (0 = lossless)
+            dither: "none", "ordered" or "floyd-steinberg"
+            dither_strength: Dither strength (0-1)
+            timer: Receives diff, quantize, lossy and encode timings
+        """
+        self.fp = fp
+        self.loop = loop
+        self.colors = max(2, min(256, colors))
+        self.optimize = optimize
+        self.diff_frames = diff_frames
+        self.palette = palette
+        self.lossy = lossy
+        self.dither = dither
+        self.dither_strength = dither_strength
+        self.timer = timer
+        self.frame_count = 0
+
+        # Pending frame: image, its pixels, duration, changed box and the
+        # unchanged-pixel mask inside that box
+        self._pending: Optional[
+            Tuple[Image.Image, np.ndarray, int, Optional[tuple], Optional[np.ndarray]]
+        ] = None
+        self._header_written = False
+
+    def add_frame(self, frame: Image.Image, duration: int):
+        """Queue an RGBA frame, writing the previously queued one"""
+        if frame.mode != "RGBA":
+            frame = frame.convert("RGBA")
+        pixels = np.asarray(frame)
+
+        if self._pending is None:
+            self._pending = (frame, pixels, duration, None, None)
+            return
+
+        previous, previous_pixels, previous_duration, previous_bbox, previous_mask = (
+            self._pending
+        )
+
+        if not is_opaque(frame):
+            # Transparent pixels must reveal the background, so the previous
+            # frame is written full-canvas and cleared once displayed
+            self._write_frame(
+                previous, previous_duration, None, None, DISPOSAL_BACKGROUND
+            )
+            self._pending = (frame, pixels, duration, None, None)
+            return
+
+        with self.timer.stage("diff"):
+            bbox, unchanged = changed_region(previous_pixels, pixels)
+        if bbox is None:
+            # Identical to the previous frame: extend it instead
+            self._pending = (
+                previous,
+                previous_pixels,
+                previous_duration + duration,
+                previous_bbox,
+                previous_mask,
+            )
+            return
+
+        self._write_frame(
+            previous, previous_duration, previous_bbox, previous_mask, DISPOSAL_NONE
+        )
+        if self.diff_frames:
+            self._pending = (frame, pixels, duration, bbox, unchanged)
+        else:
+            self._pending = (frame, pixels, duration, None, None)
+
+    def close(self):
+        """Write the last queued frame and the GIF trailer"""
+        if self._pending is not None:
+            frame, _, duration, bbox, unchanged = self._pending
+            self._write_frame(frame, duration, bbox, unchanged, DISPOSAL_NONE)
+            self._pending = None
+
+        if self._header_written:
+            self.fp.write(b";")
+
+    def _write_frame(
+        self,
+        frame: Image.Image,
+        duration: int,
+        bbox: Optional[tuple],
+        unchanged: Optional[np.ndarray],
+        disposal: int,
+    ):
+        """Quantize and encode one frame (or the changed region of it)"""
+        offset = (0, 0)
+        if bbox is not None:
+            offset = bbox[:2]
+            frame = frame.crop(bbox)
+
+            if unchanged is not None and unchanged.any():
+                # Let the previous frame show through where nothing changed
+                pixels = np.array(frame)
+                pixels[unchanged, 3] = 0
+                frame = Image.fromarray(pixels)
+
+        with self.timer.stage("quantize"):
+            if self.palette is not None:
+                im, transparency = self.palette.quantize(
+                    frame, self.dither, self.dither_strength, offset
+                )
+            else:
+                im, transparency = quantize_frame(
+                    frame, self.colors, self.dither, self.dither_strength, offset
+                )
+        if self.lossy:
+            with self.timer.stage("lossy"):
+                im = lossy_image(im, frame, self.lossy, transparency)
+
+        params = {"duration": duration, "disposal": disposal}
+        if transparency is not None:
+            params["transparency"] = transparency
+
+        if not self._header_written:
+            # A shared palette must keep its indices, so it is never trimmed
+            header_info = {
+                "loop": self.loop,
+                "optimize": self.optimize and self.palette is None,
+            }
+            if transparency is not None:
+                header_info["transparency"] = transparency
+
+            header, _ = GifImagePlugin.getheader(im, None, header_info)
+            for block in header:
+                self.fp.write(block)
+            self._header_written = True
+
+            # Palette optimization may have moved or dropped the index
+            if "transparency" in header_info:
+                params["transparency"] = header_info["transparency"]
+            else:
+                params.pop("transparency", None)
+        elif self.palette is None:
+            params["include_color_table"] = True
+
+        with self.timer.stage("encode"):
+            for block in GifImagePlugin.getdata(im, offset, **params):
+                self.fp.write(block)
+
+        self.frame_count += 1
@@ -0,0 +1,77 @@
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+
+class StageTimer:
+    """
+    Accumulates wall time per processing stage
+
+    Every stage() block adds to the stage total and count. With tracing on,
+    each block is also kept as a Chrome trace-event ("X" complete event) so
+    a batch can be inspected in chrome://tracing or Perfetto.
+    """
+
+    def __init__(self, trace: bool = False):
+        self.trace = trace
+        self.totals: Dict[str, float] = defaultdict(float)
+        self.counts: Dict[str, int] = defaultdict(int)
+        self.events: List[Dict[str, Any]] = []
+
+    @contextmanager
+    def stage(self, name: str, **args: Any) -> Iterator[None]:
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            end = time.perf_counter_ns()
+            self.totals[name] += (end - start) / 1e9
+            self.counts[name] += 1
+            if self.trace:
+                event = {
+                    "name": name,
+                    "ph": "X",
+                    "ts": start / 1000,
+                    "dur": (end - start) / 1000,
+                    "pid": os.getpid(),
+                    "tid": threading.get_ident(),
+                }
+                if args:
+                    event["args"] = args
+                self.events.append(event)
+
+    def per_call(self) -> Dict[str, float]:
+        """Mean seconds per call of each stage (per frame for frame stages)"""
+        return {name: self.totals[name] / self.counts[name] for name in self.totals}
+
+
+class _NullTimer(StageTimer):
+    """Timer that records nothing, used when no timer is supplied"""
+
+    @contextmanager
+    def stage(self, name: str, **args: Any) -> Iterator[None]:
+        yield
+
+
+NULL_TIMER = _NullTimer()
+
+
+def write_chrome_trace(path: Path, events: List[Dict[str, Any]]):
+    """Write trace events in the Chrome trace-event JSON format"""
+    pids = sorted({event["pid"] for event in events})
+    metadata = [
+        {
+            "name": "process_name",
+            "ph": "M",
+            "pid": pid,
+            "args": {"name": "main" if pid == os.getpid() else f"worker {pid}"},
+        }
+        for pid in pids
+    ]
+    with open(path, "w", encoding="utf-8") as fp:
+        json.dump({"traceEvents": metadata + events, "displayTimeUnit": "ms"}, fp)
@@ -0,0 +1,300 @@
+import ctypes
+import ctypes.util
+import logging
+import os
+import queue
+import select
+import struct
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from src.assets.gif_optimizer import (
+    GifOptimizer,
+    _init_worker,
+    _optimize_in_worker,
+    default_worker_count,
+)
+from src.assets.gif_results import FileResult
+
+# inotify event masks (see inotify(7))
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = os.O_NONBLOCK
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+# (size, mtime_ns) of a file, used to detect changes and writes in progress
+Signature = Tuple[int, int]
+
+
+class _InotifyBackend:
+    """Reports files closed after writing or moved into a directory (Linux)"""
+
+    def __init__(self, folder: Path):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._fd = libc.inotify_init1(IN_NONBLOCK)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        mask = IN_CLOSE_WRITE | IN_MOVED_TO
+        if libc.inotify_add_watch(self._fd, os.fsencode(folder), mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(errno, "inotify_add_watch failed")
+
+    def wait(self, timeout: float) -> Tuple[List[str], bool]:
+        """
+        Wait for events
+
+        Returns:
+            (names of completed files, True if events were lost)
+        """
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return [], False
+
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return [], False
+
+        names, overflow = [], False
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            _, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset : offset + length].rstrip(b"\0")
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                overflow = True
+            elif name:
+                names.append(os.fsdecode(name))
+        return names, overflow
+
+    def close(self):
+        os.close(self._fd)
+
+
+class GifFolderWatcher:
+    """
+    Long-running watch mode that optimizes GIFs as they are dropped in a folder
+
+    New files are detected with inotify where available; otherwise, and as a
+    periodic safety net, the folder is polled and a file is only picked up
+    once its size and mtime have been stable for settle_time seconds. Ready
+    files go through a bounded queue into a process pool running the
+    optimizer's worker, so a burst of uploads cannot exhaust memory.
+    """
+
+    def __init__(
+        self,
+        optimizer: GifOptimizer,
+        max_workers: Optional[int] = None,
+        poll_interval: float = 1.0,
+        settle_time: float = 2.0,
+        rescan_interval: float = 30.0,
+        max_queue: int = 1000,
+        use_inotify: bool = True,
+    ):
+        """
+        Args:
+            optimizer: Configured optimizer whose input folder is watched
+            max_workers: Worker processes (defaults to CPU count)
+            poll_interval: Seconds between polls (and inotify wait timeout)
+            settle_time: Seconds a polled file must stay unchanged before use
+            rescan_interval: Seconds between safety-net polls under inotify
+            max_queue: Ready files waiting for a worker before detection blocks
+            use_inotify: Use inotify when the platform supports it
+        """
+        self.optimizer = optimizer
+        self.folder = optimizer.input_folder
+        self.max_workers = max(1, max_workers or default_worker_count())
+        self.poll_interval = poll_interval
+        self.settle_time = settle_time
+        self.rescan_interval = rescan_interval
+        self.use_inotify = use_inotify
+        self.logger = logging.getLogger(__name__)
+
+        self._queue: "queue.Queue[Tuple[Path, float]]" = queue.Queue(max_queue)
+        self._slots = threading.BoundedSemaphore(self.max_workers * 2)
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+        # Files waiting to settle: path -> (signature, time first seen with it)
+        self._settling: Dict[Path, Tuple[Signature, float]] = {}
+        # Files queued or being processed, and signatures already handled
+        self._active: Set[Path] = set()
+        self._handled: Dict[Path, Signature] = {}
+
+    def run(self):
+        """Watch and process until stop() is called"""
+        backend = self._open_backend()
+        executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=_init_worker,
+            initargs=(self.optimizer._worker_args(),),
+        )
+        dispatcher = threading.Thread(
+            target=self._dispatch, args=(executor,), name="gif-watch-dispatch"
+        )
+        dispatcher.start()
+
+        self.logger.info(
+            f"Watching {self.folder} "
+            f"({'inotify' if backend else 'polling'}, {self.max_workers} workers)"
+        )
+
+        try:
+            last_scan = 0.0
+            while not self._stop.is_set():
+                if backend:
+                    names, overflow = backend.wait(self.poll_interval)
+                    for name in names:
+                        self._offer(self.folder / name, ready=True)
+                    # Poll while polled files are still settling, on lost
+                    # events and periodically as a safety net
+                    if (
+                        overflow
+                        or self._settling
+                        or time.monotonic() - last_scan >= self.rescan_interval
+                    ):
+                        self._scan()
+                        last_scan = time.monotonic()
+                else:
+                    self._scan()
+                    self._stop.wait(self.poll_interval)
+        finally:
+            self._stop.set()
+            dispatcher.join()
+            executor.shutdown(wait=True)
+            if backend:
+                backend.close()
+            self.optimizer.results.close()
+            self.optimizer._log_final_stats()
+
+    def stop(self):
+        """Ask run() to finish the work in flight and return"""
+        self._stop.set()
+
+    def _open_backend(self) -> Optional[_InotifyBackend]:
+        if not self.use_inotify:
+            return None
+        try:
+            return _InotifyBackend(self.folder)
+        except (OSError, AttributeError, TypeError) as e:
+            self.logger.info(f"inotify unavailable, falling back to polling: {e}")
+            return None
+
+    def _scan(self):
+        """Poll the folder, offering files whose size and mtime have settled"""
+        try:
+            entries = list(os.scandir(self.folder))
+        except OSError as e:
+            self.logger.error(f"Cannot scan {self.folder}: {e}")
+            return
+
+        seen = set()
+        for entry in entries:
+            if entry.name.lower().endswith(".gif") and entry.is_file():
+                path = Path(entry.path)
+                seen.add(path)
+                self._offer(path, ready=False)
+
+        # Forget files that vanished before settling
+        for path in list(self._settling):
+            if path not in seen:
+                del self._settling[path]
+
+        # Forget handled files that were deleted or moved away, so a daemon
+        # does not remember every upload it has ever seen
+        with self._lock:
+            gone = [
+                path
+                for path in self._handled
+                if path not in seen and path not in self._active and not path.exists()
+            ]
+            for path in gone:
+                del self._handled[path]
+
+    def _offer(self, path: Path, ready: bool):
+        """Queue path if it is new or changed and (when polled) has settled"""
+        if not path.name.lower().endswith(".gif"):
+            return
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return
+        signature = (stat.st_size, stat.st_mtime_ns)
+
+        with self._lock:
+            if path in self._active or self._handled.get(path) == signature:
+                return
+
+        now = time.monotonic()
+        if not ready:
+            previous = self._settling.get(path)
+            if previous is None or previous[0] != signature:
+                self._settling[path] = (signature, now)
+                return
+            if now - previous[1] < self.settle_time:
+                return
+
+        self._settling.pop(path, None)
+        with self._lock:
+            self._active.add(path)
+            self._handled[path] = signature
+
+        while not self._stop.is_set():
+            try:
+                self._queue.put((path, now), timeout=self.poll_interval)
+                return
+            except queue.Full:
+                continue
+
+    def _dispatch(self, executor: ProcessPoolExecutor):
+        """Move ready files from the queue into the pool, bounded by _slots"""
+        while not self._stop.is_set():
+            try:
+                path, detected = self._queue.get(timeout=self.poll_interval)
+            except queue.Empty:
+                continue
+
+            acquired = False
+            while not acquired and not self._stop.is_set():
+                acquired = self._slots.acquire(timeout=self.poll_interval)
+
+            if not acquired:
+                # Stopping: leave the file for the next run
+                with self._lock:
+                    self._active.discard(path)
+                    self._handled.pop(path, None)
+                continue
+
+            future = executor.submit(_optimize_in_worker, path)
+            future.add_done_callback(
+                lambda f, p=path, t=detected: self._completed(f, p, t)
+            )
+
+    def _completed(self, future: Future, path: Path, detected: float):
+        """Record the worker's result once a file is done"""
+        try:
+            result = future.result()
+        except Exception as e:
+            self.logger.error(f"Worker failed on {path.name}: {str(e)}")
+            result = FileResult(str(path))
+            result.error = str(e)
+        finally:
+            self._slots.release()
+
+        latency = time.monotonic() - detected
+        with self._lock:
+            self._active.discard(path)
+        self.optimizer.results.add(result)
+
+        status = "optimized" if result.success else "failed"
+        self.logger.info(f"{path.name} {status} {latency:.1f} s after detection")
@@ -0,0 +1,45 @@
+import os
+
+from src.assets.gif_cache import EVICT_TO, ResultCache
+
+
+def _disk_total(cache: ResultCache) -> int:
+    return sum(path.stat().st_size for path in cache.directory.glob("*/*.gif"))
+
+
+def test_evicts_least_recently_used_down_to_evict_to(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"), max_bytes=1000)
+    keys = ["aa01", "bb02", "cc03"]
+    for key in keys:
+        cache.put(key, b"x" * 300)
+    # Puts land within the same clock tick; age the entries in key order
+    for age, key in enumerate(keys):
+        os.utime(cache._entry_path(key), (age + 1, age + 1))
+
+    # A hit makes the oldest entry the most recently used
+    assert cache.get("aa01", tmp_path / "copy.gif") == 300
+
+    cache.put("dd04", b"x" * 300)
+    assert cache.peek("bb02") is None
+    assert all(cache.peek(key) for key in ("aa01", "cc03", "dd04"))
+    assert cache._total == _disk_total(cache) == 900
+    assert cache._total <= 1000 * EVICT_TO
+
+
+def test_running_total_avoids_rescans_until_over_the_cap(tmp_path, monkeypatch):
+    cache = ResultCache(str(tmp_path / "cache"), max_bytes=1000)
+    scans = []
+    scan = cache._scan
+    monkeypatch.setattr(cache, "_scan", lambda: scans.append(1) or scan())
+
+    cache.put("aa01", b"x" * 400)
+    # Replacing an entry only counts the size difference
+    cache.put("aa01", b"x" * 500)
+    cache.put("bb02", b"x" * 400)
+    assert len(scans) == 1
+    assert cache._total == _disk_total(cache) == 900
+
+    # Going over the cap rescans once and frees down to EVICT_TO of it
+    cache.put("cc03", b"x" * 200)
+    assert len(scans) == 2
+    assert cache._total == _disk_total(cache) <= 1000 * EVICT_TO
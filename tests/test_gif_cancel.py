@@ -0,0 +1,63 @@
+from pathlib import Path
+
+from PIL import Image
+
+from src.assets.gif_cancel import CancelToken
+from src.assets.gif_optimizer import GifOptimizer
+
+
+def _make_sources(folder: Path, count: int):
+    folder.mkdir()
+    for idx in range(count):
+        frames = [
+            Image.new("RGB", (32, 32), (idx * 40, shade, 128)) for shade in (0, 120)
+        ]
+        frames[0].save(
+            folder / f"{idx}.gif", save_all=True, append_images=frames[1:], duration=50
+        )
+
+
+def _run(tmp_path: Path, monkeypatch, cancel_after: int = 0):
+    source = tmp_path / "in"
+    _make_sources(source, 5)
+    token = CancelToken()
+    percents = []
+
+    # Cancel once cancel_after files are done (progress updates are
+    # throttled, so they cannot be relied on to trigger it)
+    done = []
+    process_file = GifOptimizer._process_file
+
+    def process_then_cancel(self, input_path):
+        result = process_file(self, input_path)
+        done.append(input_path)
+        if len(done) == cancel_after:
+            token.cancel()
+        return result
+
+    monkeypatch.setattr(GifOptimizer, "_process_file", process_then_cancel)
+    optimizer = GifOptimizer(
+        str(source),
+        50,
+        str(tmp_path / "out"),
+        progress_callback=percents.append,
+        max_workers=1,
+        cancel_token=token,
+    )
+    return optimizer.process_folder(), percents
+
+
+def test_completed_batch_reports_100(tmp_path, monkeypatch):
+    # The optimizer logs to gif_optimizer.log in the working directory
+    monkeypatch.chdir(tmp_path)
+    stats, percents = _run(tmp_path, monkeypatch)
+    assert stats["processed"] == 5
+    assert percents[-1] == 100
+
+
+def test_cancelled_batch_does_not_report_100(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    stats, percents = _run(tmp_path, monkeypatch, cancel_after=2)
+    assert stats["processed"] == 2
+    assert stats["processed"] + stats["cancelled"] == 5
+    assert 100 not in percents
@@ -0,0 +1,107 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from PIL import Image
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Runs the CLI as `python -m src.assets.gif_cli` would, recording every
+# attempt to import PyQt5 (installed or not), then prints the exit code and
+# the recorded names as the last line of stdout
+RUN_SCRIPT = """
+import json
+import runpy
+import sys
+
+attempted = []
+
+
+class RecordQt:
+    def find_spec(self, name, path=None, target=None):
+        if name.split(".")[0] == "PyQt5":
+            attempted.append(name)
+        return None
+
+
+sys.meta_path.insert(0, RecordQt())
+sys.argv = ["gif_cli"] + sys.argv[1:]
+try:
+    runpy.run_module("src.assets.gif_cli", run_name="__main__")
+    code = 0
+except SystemExit as e:
+    code = e.code
+qt_modules = [name for name in sys.modules if name.split(".")[0] == "PyQt5"]
+print(json.dumps({"code": code, "attempted": attempted, "loaded": qt_modules}))
+"""
+
+
+def _run_cli(cwd: Path, *args: str) -> dict:
+    """Exit code and PyQt5 imports of one CLI run in a fresh interpreter"""
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    completed = subprocess.run(
+        [sys.executable, "-c", RUN_SCRIPT, *args],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def _write_gif(path: Path):
+    frames = [Image.new("RGB", (32, 24), color) for color in ("red", "blue")]
+    frames[0].save(path, save_all=True, append_images=frames[1:], duration=100)
+
+
+def _assert_no_qt(run: dict):
+    assert run["attempted"] == []
+    assert run["loaded"] == []
+
+
+def test_success_exits_0_without_pyqt5(tmp_path):
+    source = tmp_path / "in"
+    source.mkdir()
+    _write_gif(source / "ok.gif")
+
+    run = _run_cli(tmp_path, str(source), "-o", str(tmp_path / "out"))
+    assert run["code"] == 0
+    _assert_no_qt(run)
+
+
+def test_failed_file_exits_1_without_pyqt5(tmp_path):
+    source = tmp_path / "in"
+    source.mkdir()
+    _write_gif(source / "ok.gif")
+    (source / "broken.gif").write_bytes(b"GIF89a not really a gif")
+
+    run = _run_cli(tmp_path, str(source), "-o", str(tmp_path / "out"))
+    assert run["code"] == 1
+    _assert_no_qt(run)
+
+
+def test_usage_errors_exit_2_without_pyqt5(tmp_path):
+    run = _run_cli(tmp_path, str(tmp_path / "missing"))
+    assert run["code"] == 2
+    _assert_no_qt(run)
+
+    run = _run_cli(tmp_path, str(tmp_path), "--output-format", "bmp")
+    assert run["code"] == 2
+    _assert_no_qt(run)
+
+
+def test_trace_option_writes_chrome_trace(tmp_path):
+    source = tmp_path / "in"
+    source.mkdir()
+    _write_gif(source / "ok.gif")
+    trace = tmp_path / "trace.json"
+
+    run = _run_cli(
+        tmp_path, str(source), "-o", str(tmp_path / "out"), "--trace", str(trace)
+    )
+    assert run["code"] == 0
+    events = json.loads(trace.read_text(encoding="utf-8"))["traceEvents"]
+    stages = {event["name"] for event in events if event["ph"] == "X"}
+    assert "file" in stages
@@ -0,0 +1,46 @@
+from pathlib import Path
+
+from PIL import Image
+
+from src.assets.gif_discovery import walk_gif_files
+from src.assets.gif_optimizer import GifOptimizer
+
+
+def _touch_gif(path: Path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    Image.new("RGB", (8, 8), (200, 40, 40)).save(path)
+
+
+def _names(paths, root: Path):
+    return sorted(path.relative_to(root).as_posix() for path in paths)
+
+
+def test_globs_ignore_case_like_the_suffix(tmp_path):
+    for name in ("a.gif", "B.GIF", "sub/C.Gif", "Skip/d.gif"):
+        _touch_gif(tmp_path / name)
+
+    found = walk_gif_files(tmp_path, recursive=True, include=["*.gif"])
+    assert _names(found, tmp_path) == ["B.GIF", "Skip/d.gif", "a.gif", "sub/C.Gif"]
+
+    found = walk_gif_files(tmp_path, recursive=True, exclude=["skip", "*.GIF"])
+    assert _names(found, tmp_path) == []
+
+    found = walk_gif_files(tmp_path, recursive=True, exclude=["SKIP"])
+    assert _names(found, tmp_path) == ["B.GIF", "a.gif", "sub/C.Gif"]
+
+
+def test_output_folder_skipped_only_when_nested(tmp_path, monkeypatch):
+    # The optimizer logs to gif_optimizer.log in the working directory
+    monkeypatch.chdir(tmp_path)
+    source = tmp_path / "in"
+    _touch_gif(source / "a.gif")
+    _touch_gif(source / "out" / "optimized_a.gif")
+
+    nested = GifOptimizer(str(source), 50, str(source / "out"), recursive=True)
+    assert _names(nested._discover_files(), source) == ["a.gif"]
+
+    same = GifOptimizer(str(source), 50, str(source), recursive=True)
+    assert _names(same._discover_files(), source) == [
+        "a.gif",
+        "out/optimized_a.gif",
+    ]
@@ -0,0 +1,64 @@
+import numpy as np
+from PIL import Image
+
+from src.assets.gif_dither import bayer_matrix, floyd_steinberg, ordered_dither
+from src.assets.gif_palette import PaletteMapper, nearest_indices
+
+BLACK_WHITE = np.array([[0, 0, 0], [255, 255, 255]], dtype=np.uint8)
+
+
+def _nearest(palette: np.ndarray):
+    palette = palette.astype(np.float32)
+    return lambda colors: nearest_indices(colors, palette)
+
+
+def _noise(seed: int = 0, size=(24, 32)) -> np.ndarray:
+    return np.random.default_rng(seed).integers(0, 256, (*size, 3), dtype=np.uint8)
+
+
+def test_bayer_matrix_covers_every_threshold_once():
+    matrix = bayer_matrix(8)
+    assert matrix.shape == (8, 8)
+    assert np.allclose(np.sort(matrix.ravel()), (np.arange(64) + 0.5) / 64 - 0.5)
+
+
+def test_ordered_dither_is_anchored_to_the_canvas():
+    rgb = _noise()
+    full = ordered_dither(rgb, 40)
+    # A crop dithered at its canvas position matches the full frame there
+    crop = ordered_dither(rgb[5:17, 3:22], 40, origin=(3, 5))
+    assert np.array_equal(crop, full[5:17, 3:22])
+    assert np.array_equal(ordered_dither(rgb, 0), rgb)
+
+
+def test_floyd_steinberg_without_strength_is_nearest_color():
+    rgb = _noise(seed=1)
+    palette = np.array([[0, 0, 0], [255, 0, 0], [0, 255, 0], [0, 0, 255]])
+    nearest = _nearest(palette)
+    plain = nearest(rgb.reshape(-1, 3).astype(np.float32)).reshape(rgb.shape[:2])
+    assert np.array_equal(floyd_steinberg(rgb, nearest, palette, 0.0), plain)
+
+
+def test_floyd_steinberg_preserves_mean_tone_deterministically():
+    gray = np.full((32, 32, 3), 64, dtype=np.uint8)
+    nearest = _nearest(BLACK_WHITE)
+    first = floyd_steinberg(gray, nearest, BLACK_WHITE)
+    second = floyd_steinberg(gray.copy(), nearest, BLACK_WHITE)
+    assert np.array_equal(first, second)
+
+    # Plain mapping turns 25% gray black; diffusion keeps about a quarter white
+    assert not nearest(gray.reshape(-1, 3).astype(np.float32)).any()
+    assert abs(first.mean() - 64 / 255) < 0.02
+
+
+def test_dither_modes_through_the_palette_mapper():
+    frame = Image.fromarray(np.full((16, 16, 3), 64, dtype=np.uint8)).convert("RGBA")
+    mapper = PaletteMapper(BLACK_WHITE)
+    white = {}
+    for mode in ("none", "ordered", "floyd-steinberg"):
+        im, transparency = mapper.quantize(frame, mode)
+        assert transparency is None
+        white[mode] = np.asarray(im).mean()
+    assert white["none"] == 0
+    assert 0.1 < white["ordered"] < 0.4
+    assert 0.2 < white["floyd-steinberg"] < 0.3
@@ -0,0 +1,63 @@
+import numpy as np
+
+from src.assets.gif_lossy import lossy_indices, tolerance_for_quality
+from src.assets.gif_palette import median_cut, nearest_indices
+
+
+def _quantized(seed: int = 0, size=(40, 60), colors: int = 32):
+    """Noisy gradient, its palette and the nearest-color indices"""
+    rng = np.random.default_rng(seed)
+    ramp = np.linspace(0, 255, size[1])[None, :, None]
+    rgb = np.clip(ramp + rng.normal(0, 12, (*size, 3)), 0, 255).astype(np.uint8)
+    palette = median_cut(rgb.reshape(-1, 3), colors)
+    indices = nearest_indices(
+        rgb.reshape(-1, 3).astype(np.float32), palette.astype(np.float32)
+    ).reshape(size)
+    return rgb, palette, indices
+
+
+def _runs(indices: np.ndarray) -> int:
+    """Number of index changes along the rows"""
+    return int((indices[:, 1:] != indices[:, :-1]).sum())
+
+
+def test_zero_tolerance_returns_indices_unchanged():
+    rgb, palette, indices = _quantized()
+    assert tolerance_for_quality(100) == 0
+    assert lossy_indices(indices, rgb, palette, 0) is indices
+
+
+def test_error_stays_within_tolerance_and_runs_grow():
+    rgb, palette, indices = _quantized()
+    tolerance = tolerance_for_quality(80)
+    out = lossy_indices(indices, rgb, palette, tolerance)
+
+    changed = out != indices
+    assert changed.any()
+    error = np.sqrt(
+        ((rgb[changed].astype(np.int32) - palette[out[changed]].astype(np.int32)) ** 2)
+        .sum(axis=1)
+    )
+    assert error.max() <= tolerance
+    assert _runs(out) < _runs(indices)
+
+    # Only ever copies the index to the left; the first column is kept
+    assert (out[:, 0] == indices[:, 0]).all()
+    ys, xs = np.nonzero(changed)
+    assert (out[ys, xs] == out[ys, xs - 1]).all()
+
+
+def test_output_is_deterministic():
+    rgb, palette, indices = _quantized(seed=3)
+    first = lossy_indices(indices, rgb, palette, 20)
+    second = lossy_indices(indices.copy(), rgb.copy(), palette, 20)
+    assert np.array_equal(first, second)
+
+
+def test_transparent_pixels_are_never_extended():
+    rgb, palette, indices = _quantized()
+    transparency = len(palette)
+    indices = indices.copy()
+    indices[:, ::5] = transparency
+    out = lossy_indices(indices, rgb, palette, 40, transparency)
+    assert np.array_equal(out == transparency, indices == transparency)
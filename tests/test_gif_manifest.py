@@ -0,0 +1,67 @@
+import json
+from pathlib import Path
+
+from PIL import Image
+
+from src.assets.gif_manifest import MANIFEST_NAME, ProcessingManifest
+from src.assets.gif_optimizer import GifOptimizer
+
+
+def _write_gif(path: Path, shade: int):
+    frames = [
+        Image.new("RGB", (32, 32), (shade, idx * 60, 255 - shade)) for idx in range(3)
+    ]
+    frames[0].save(path, save_all=True, append_images=frames[1:], duration=50)
+
+
+def _make_sources(folder: Path, count: int = 3):
+    folder.mkdir()
+    for idx in range(count):
+        _write_gif(folder / f"{idx}.gif", idx * 80)
+
+
+def test_source_removed_mid_run_is_not_recorded(tmp_path, monkeypatch):
+    # The optimizer logs to gif_optimizer.log in the working directory
+    monkeypatch.chdir(tmp_path)
+    source = tmp_path / "in"
+    output = tmp_path / "out"
+    _make_sources(source)
+
+    # Delete the first source right after it has been processed, before its
+    # manifest entry is recorded
+    process_file = GifOptimizer._process_file
+
+    def process_then_delete(self, input_path):
+        result = process_file(self, input_path)
+        if input_path.name == "0.gif":
+            input_path.unlink()
+        return result
+
+    monkeypatch.setattr(GifOptimizer, "_process_file", process_then_delete)
+    optimizer = GifOptimizer(
+        str(source), 50, str(output), max_workers=1, incremental=True
+    )
+    optimizer.process_folder()
+
+    data = json.loads((output / MANIFEST_NAME).read_text(encoding="utf-8"))
+    assert sorted(data["files"]) == ["1.gif", "2.gif"]
+
+
+def test_deleted_source_is_not_current(tmp_path):
+    source = tmp_path / "in"
+    output = tmp_path / "out"
+    _make_sources(source, 1)
+    output.mkdir()
+    gif_file = source / "0.gif"
+    (output / "0.gif").write_bytes(gif_file.read_bytes())
+
+    manifest = ProcessingManifest(output)
+    manifest.record("0.gif", gif_file, "settings", output / "0.gif")
+    assert manifest.is_current("0.gif", gif_file, "settings")
+
+    gif_file.unlink()
+    assert not manifest.is_current("0.gif", gif_file, "settings")
+
+    manifest = ProcessingManifest(output)
+    manifest.record("0.gif", gif_file, "settings", output / "0.gif")
+    assert "0.gif" not in manifest.entries
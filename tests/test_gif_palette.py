@@ -0,0 +1,79 @@
+import io
+
+import numpy as np
+from PIL import Image, ImageSequence
+
+from src.assets.gif_palette import (
+    PaletteMapper,
+    median_cut,
+    nearest_indices,
+    sample_pixels,
+)
+from src.assets.gif_probe import parse_gif
+from src.assets.gif_stream import GifStreamWriter
+
+
+def _animation(frames: int = 6, size=(40, 30)) -> Image.Image:
+    """Animated GIF of moving colored bars, reopened from memory"""
+    images = []
+    for idx in range(frames):
+        pixels = np.zeros((size[1], size[0], 3), dtype=np.uint8)
+        pixels[:, :, 2] = np.linspace(0, 255, size[0])[None, :]
+        pixels[idx * 4 : idx * 4 + 6, :, 0] = 200 + idx * 9
+        images.append(Image.fromarray(pixels))
+    buffer = io.BytesIO()
+    images[0].save(
+        buffer, "GIF", save_all=True, append_images=images[1:], duration=50, loop=0
+    )
+    return Image.open(buffer)
+
+
+def test_median_cut_respects_size_and_sample_colors():
+    samples = sample_pixels(_animation())
+    palette = median_cut(samples, 15)
+    assert palette.shape == (15, 3)
+    assert np.array_equal(median_cut(samples, 15), palette)
+
+    # Fewer distinct colors than requested: every one gets an exact entry
+    two = np.array([[10, 20, 30]] * 50 + [[200, 100, 0]] * 50, dtype=np.uint8)
+    assert sorted(map(tuple, median_cut(two, 8).tolist())) == [
+        (10, 20, 30),
+        (200, 100, 0),
+    ]
+
+
+def test_mapper_cache_agrees_with_direct_lookup():
+    rng = np.random.default_rng(0)
+    palette = rng.integers(0, 256, (31, 3), dtype=np.uint8)
+    mapper = PaletteMapper(palette)
+    rgb = rng.integers(0, 256, (20, 20, 3), dtype=np.uint8)
+
+    expected = nearest_indices(
+        rgb.reshape(-1, 3).astype(np.float32), palette.astype(np.float32)
+    ).reshape(20, 20)
+    # The second call is served from the cache
+    assert np.array_equal(mapper.map(rgb), expected)
+    assert np.array_equal(mapper.map(rgb), expected)
+
+
+def test_shared_palette_is_written_once_as_global_table():
+    animation = _animation()
+    mapper = PaletteMapper(median_cut(sample_pixels(animation), 31))
+
+    output = io.BytesIO()
+    writer = GifStreamWriter(output, colors=32, palette=mapper)
+    for frame in ImageSequence.Iterator(animation):
+        writer.add_frame(frame.convert("RGBA"), 50)
+    writer.close()
+
+    probe = parse_gif(output.getvalue())
+    assert probe.frames == animation.n_frames
+    assert probe.local_palettes == 0
+    assert 0 < probe.global_colors <= 32
+
+    # Every frame decodes to colors of the shared palette
+    allowed = set(map(tuple, mapper.palette.tolist()))
+    with Image.open(io.BytesIO(output.getvalue())) as im:
+        for frame in ImageSequence.Iterator(im):
+            colors = frame.convert("RGB").getcolors(1 << 16)
+            assert {color for _, color in colors} <= allowed
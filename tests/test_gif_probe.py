@@ -0,0 +1,82 @@
+from pathlib import Path
+
+import pytest
+from PIL import Image, ImageSequence
+
+from src.assets.gif_probe import ProbeIndex, parse_gif, probe_gif
+
+
+def _write_gif(path: Path, frames: int, size=(48, 32), **params) -> Path:
+    images = [
+        Image.new("RGB", size, (idx * 40 % 256, 255 - idx * 20, idx * 90 % 256))
+        for idx in range(frames)
+    ]
+    if frames > 1:
+        params.update(save_all=True, append_images=images[1:])
+    images[0].save(path, **params)
+    return path
+
+
+def _pillow_metadata(path: Path):
+    with Image.open(path) as im:
+        duration = sum(
+            frame.info.get("duration", 0) for frame in ImageSequence.Iterator(im)
+        )
+        return im.size, im.n_frames, duration, im.info.get("loop")
+
+
+@pytest.mark.parametrize(
+    "frames, params",
+    [
+        (1, {}),
+        (5, {"duration": [40, 80, 120, 40, 200], "loop": 0}),
+        (3, {"duration": 100, "loop": 3}),
+        # No loop parameter: Pillow writes no NETSCAPE block
+        (4, {"duration": 60}),
+    ],
+    ids=["static", "loop-forever", "loop-3", "no-netscape"],
+)
+def test_probe_matches_pillow(tmp_path, frames, params):
+    path = _write_gif(tmp_path / "probe.gif", frames, **params)
+    probe = probe_gif(path)
+
+    size, n_frames, duration, loop = _pillow_metadata(path)
+    assert (probe.width, probe.height) == size
+    assert probe.frames == n_frames == frames
+    assert probe.duration == duration
+    assert probe.loop == loop == params.get("loop")
+    assert 0 < probe.colors <= 256
+
+
+def test_truncated_or_foreign_input_is_rejected(tmp_path):
+    data = _write_gif(tmp_path / "anim.gif", 5, (64, 64), duration=50).read_bytes()
+
+    for cut in (len(data) // 2, len(data) - 1, 12):
+        truncated = tmp_path / f"cut{cut}.gif"
+        truncated.write_bytes(data[:cut])
+        assert probe_gif(truncated) is None
+        with pytest.raises(ValueError):
+            parse_gif(data[:cut])
+
+    empty = tmp_path / "empty.gif"
+    empty.write_bytes(b"")
+    assert probe_gif(empty) is None
+    png = tmp_path / "image.gif"
+    Image.new("RGB", (8, 8)).save(png, format="PNG")
+    assert probe_gif(png) is None
+    assert probe_gif(tmp_path / "missing.gif") is None
+
+
+def test_probe_index_reuses_unchanged_entries(tmp_path):
+    path = _write_gif(tmp_path / "anim.gif", 3, duration=50)
+    index = ProbeIndex(tmp_path)
+    assert index.get(path).frames == 3
+    index.save()
+
+    index = ProbeIndex(tmp_path).load()
+    assert index.get(path).frames == 3
+    assert (index.hits, index.misses) == (1, 0)
+
+    _write_gif(path, 4, duration=50)
+    assert index.get(path).frames == 4
+    assert index.misses == 1
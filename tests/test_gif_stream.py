@@ -0,0 +1,67 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+WIDTH, HEIGHT = 320, 240
+
+# Writes a GIF of FRAMES distinct frames (streamed, so writing it does not
+# raise the peak), optimizes it with GifOptimizer._process_file to a target
+# far below its size and prints the peak RSS of the process in KB
+OPTIMIZE_SCRIPT = f"""
+import resource
+import sys
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from src.assets.gif_optimizer import GifOptimizer
+from src.assets.gif_stream import GifStreamWriter
+
+frames = int(sys.argv[1])
+source = Path("in")
+source.mkdir()
+path = source / "anim.gif"
+rng = np.random.default_rng(0)
+base = rng.integers(0, 256, ({HEIGHT}, {WIDTH}, 3), dtype=np.uint8)
+with open(path, "wb") as fp:
+    writer = GifStreamWriter(fp, colors=64)
+    for idx in range(frames):
+        pixels = base.copy()
+        top = (idx * 7) % ({HEIGHT} - 64)
+        pixels[top : top + 64] = rng.integers(0, 256, (64, {WIDTH}, 3))
+        writer.add_frame(Image.fromarray(pixels).convert("RGBA"), 40)
+    writer.close()
+
+optimizer = GifOptimizer(str(source), 50, "out", max_workers=1)
+result = optimizer._process_file(path)
+assert result.success and result.frames == frames, result
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def _peak_rss_kb(frames: int, cwd: Path) -> int:
+    """Peak RSS of optimizing a frames-frame GIF in a fresh interpreter"""
+    cwd.mkdir()
+    completed = subprocess.run(
+        [sys.executable, "-c", OPTIMIZE_SCRIPT, str(frames)],
+        cwd=cwd,
+        env={**os.environ, "PYTHONPATH": str(ROOT)},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return int(completed.stdout.split()[-1])
+
+
+def test_peak_rss_stays_flat_as_frame_count_grows(tmp_path):
+    small = _peak_rss_kb(50, tmp_path / "small")
+    large = _peak_rss_kb(300, tmp_path / "large")
+
+    # Buffering the extra 250 RGBA frames would add about 75 MB; streaming
+    # leaves only allocator noise
+    frame_kb = WIDTH * HEIGHT * 4 // 1024
+    assert large - small < 25 * frame_kb, (small, large)